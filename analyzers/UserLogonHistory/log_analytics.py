@@ -0,0 +1,381 @@
+"""
+Direct Log Analytics backend for the User Logon History Analyzer.
+
+Queries the Log Analytics REST API for a user's sign-in rows and aggregates
+them locally into the same structure the Logic App returns, so summary(),
+artifacts() and the report templates work unchanged.
+
+- LogAnalyticsClient: Client-credentials token and paged KQL queries
+- SigninAggregator: Incremental aggregation of sign-in rows
+
+Rows are fetched in keyset-paginated pages (ordered by TimeGenerated and Id)
+and streamed into the aggregator, so memory stays bounded by the page size
+rather than the number of sign-ins.
+
+Author: Brightspeed CIRT Team
+License: AGPL-V3
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import requests
+
+
+class LogAnalyticsError(Exception):
+    """Raised when a Log Analytics token or query request fails."""
+
+
+# Sign-ins from interactive and non-interactive logs, reduced to the columns
+# the aggregator needs. Values are bound through the let statements.
+# DeviceDetail is dynamic in SigninLogs but a string in
+# AADNonInteractiveUserSignInLogs; a plain union splits it into
+# DeviceDetail_dynamic and DeviceDetail_string, so each table is normalised
+# to a dynamic Device column before the union.
+SIGNIN_QUERY = '''
+let account = {account};
+let page_size = {page_size};
+let cursor_time = {cursor_time};
+let cursor_id = {cursor_id};
+union (SigninLogs | extend Device = DeviceDetail),
+      (AADNonInteractiveUserSignInLogs | extend Device = todynamic(DeviceDetail))
+| where UserPrincipalName =~ account
+| where isnull(cursor_time) or TimeGenerated < cursor_time or (TimeGenerated == cursor_time and Id < cursor_id)
+| project TimeGenerated, Id, ResultType = tostring(ResultType), IPAddress, Location,
+          DeviceName = tostring(Device.displayName), OperatingSystem = tostring(Device.operatingSystem),
+          RiskLevelDuringSignIn, AuthenticationRequirement, IsInteractive
+| order by TimeGenerated desc, Id desc
+| take page_size
+'''
+
+
+def http_error_message(error):
+    """
+    Extract the service's error message from a failed HTTP response.
+
+    Log Analytics returns {"error": {"message": ...}}; Azure AD returns
+    {"error": ..., "error_description": ...}.
+
+    Args:
+        error (requests.exceptions.HTTPError): Raised by APIClient
+
+    Returns:
+        str: Error message, or the HTTP error itself if the body has none
+    """
+    try:
+        body = error.response.json()
+    except (AttributeError, ValueError):
+        return str(error)
+
+    detail = body.get('error') if isinstance(body, dict) else None
+    if isinstance(detail, dict) and detail.get('message'):
+        return detail['message']
+    if isinstance(body, dict) and body.get('error_description'):
+        return body['error_description']
+    return str(detail or error)
+
+
+def kql_string(value):
+    """
+    Render a value as a KQL string literal.
+
+    KQL double-quoted strings use the same escapes as JSON, so the value
+    cannot break out of the literal.
+
+    Args:
+        value (str): Value to quote
+
+    Returns:
+        str: KQL string literal
+    """
+    return json.dumps(str(value))
+
+
+class LogAnalyticsClient:
+    """
+    Query a Log Analytics workspace directly.
+
+    Authenticates with Azure AD client credentials and runs KQL through the
+    workspace query API, reusing one pooled APIClient for both.
+
+    Attributes:
+        client (APIClient): Pooled HTTP client
+        workspace_id (str): Log Analytics workspace ID
+        page_size (int): Rows requested per query page
+        request_hook (callable): Called before every token and query request
+    """
+
+    def __init__(self, client, workspace_id, tenant_id, client_id, client_secret,
+                 login_url='https://login.microsoftonline.com', api_url='https://api.loganalytics.io',
+                 page_size=5000, request_hook=None):
+        """
+        Initialize the client.
+
+        Args:
+            client (APIClient): Pooled HTTP client
+            workspace_id (str): Log Analytics workspace ID
+            tenant_id (str): Azure AD tenant ID
+            client_id (str): App registration client ID
+            client_secret (str): App registration client secret
+            login_url (str): Azure AD authority (default: https://login.microsoftonline.com)
+            api_url (str): Log Analytics API base URL (default: https://api.loganalytics.io)
+            page_size (int): Rows requested per query page (default: 5000)
+            request_hook (callable): Called with no arguments before every
+                                     token and query request (e.g. a rate limiter)
+        """
+        self.client = client
+        self.workspace_id = workspace_id
+        self.tenant_id = tenant_id
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.login_url = login_url.rstrip('/')
+        self.api_url = api_url.rstrip('/')
+        self.page_size = page_size
+        self.request_hook = request_hook
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._token = None
+        self._token_expires_at = 0
+        self._token_lock = threading.Lock()
+
+    def get_token(self):
+        """
+        Return a cached access token, requesting a new one shortly before expiry.
+
+        Returns:
+            str: Bearer token
+
+        Raises:
+            LogAnalyticsError: If the token request fails or has no access token
+        """
+        with self._token_lock:
+            if self._token and time.time() < self._token_expires_at:
+                return self._token
+
+            if self.request_hook:
+                self.request_hook()
+            try:
+                response = self.client.post(
+                    f'{self.login_url}/{self.tenant_id}/oauth2/v2.0/token',
+                    form={
+                        'grant_type': 'client_credentials',
+                        'client_id': self.client_id,
+                        'client_secret': self.client_secret,
+                        'scope': f'{self.api_url}/.default'
+                    }
+                )
+            except requests.exceptions.HTTPError as e:
+                raise LogAnalyticsError(f'Token request failed: {http_error_message(e)}') from e
+            if not isinstance(response, dict) or 'access_token' not in response:
+                raise LogAnalyticsError('Token response missing access_token')
+
+            self._token = response['access_token']
+            self._token_expires_at = time.time() + int(response.get('expires_in', 3600)) - 60
+            return self._token
+
+    def query(self, kql, timespan=None):
+        """
+        Run a KQL query and return the primary result table.
+
+        Args:
+            kql (str): Query text
+            timespan (str): ISO 8601 duration bounding the scan (e.g. 'PT24H')
+
+        Returns:
+            tuple: (column names, rows)
+
+        Raises:
+            LogAnalyticsError: If the query is rejected or the response has
+                               no result table
+        """
+        body = {'query': kql}
+        if timespan:
+            body['timespan'] = timespan
+
+        token = self.get_token()
+        if self.request_hook:
+            self.request_hook()
+        try:
+            response = self.client.post(
+                f'{self.api_url}/v1/workspaces/{self.workspace_id}/query',
+                data=body,
+                headers={'Authorization': f'Bearer {token}'}
+            )
+        except requests.exceptions.HTTPError as e:
+            # The 4xx body explains bad KQL, missing permissions, etc.
+            raise LogAnalyticsError(f'Log Analytics query failed: {http_error_message(e)}') from e
+
+        tables = response.get('tables') if isinstance(response, dict) else None
+        if not tables:
+            error = response.get('error', {}) if isinstance(response, dict) else {}
+            raise LogAnalyticsError(f'Log Analytics query failed: {error.get("message", "no result table")}')
+
+        table = tables[0]
+        return [column['name'] for column in table.get('columns', [])], table.get('rows', [])
+
+    def iter_signins(self, account, lookback_hours):
+        """
+        Stream a user's sign-in rows, newest first, one page at a time.
+
+        Args:
+            account (str): User principal name
+            lookback_hours (int): Query window in hours
+
+        Yields:
+            dict: Sign-in row keyed by column name
+        """
+        cursor_time = None
+        cursor_id = None
+        pages = 0
+
+        while True:
+            kql = SIGNIN_QUERY.format(
+                account=kql_string(account),
+                page_size=int(self.page_size),
+                cursor_time=f'todatetime({kql_string(cursor_time)})' if cursor_time else 'datetime(null)',
+                cursor_id=kql_string(cursor_id or '')
+            )
+            columns, rows = self.query(kql, timespan=f'PT{int(lookback_hours)}H')
+            pages += 1
+
+            for row in rows:
+                yield dict(zip(columns, row))
+
+            if len(rows) < self.page_size:
+                break
+
+            last = dict(zip(columns, rows[-1]))
+            cursor_time, cursor_id = last['TimeGenerated'], last['Id']
+
+        self.logger.debug('Fetched %d sign-in pages for %s', pages, account)
+
+
+class SigninAggregator:
+    """
+    Aggregate sign-in rows into the Logic App's analysis structure.
+
+    Rows are added one at a time; only counters and distinct values are
+    kept.
+
+    The overall risk level follows the documented rules (tests/README.md):
+    High on more than five failed sign-ins, Medium on three to five failed
+    sign-ins or sign-ins from more than three countries, Unknown without
+    sign-ins, otherwise Low. MFA usage is measured over interactive
+    sign-ins, since non-interactive token refreshes never prompt for MFA.
+    """
+
+    def __init__(self):
+        """Initialize empty counters."""
+        self.total = 0
+        self.successful = 0
+        self.interactive = 0
+        self.interactive_mfa = 0
+        self.high_risk = 0
+        self.ips = Counter()
+        self.locations = set()
+        self.devices = set()
+
+    def add(self, row):
+        """
+        Add one sign-in row.
+
+        Args:
+            row (dict): Row from LogAnalyticsClient.iter_signins()
+        """
+        self.total += 1
+        if str(row.get('ResultType')) == '0':
+            self.successful += 1
+        if row.get('IsInteractive') in (True, 'true', 'True', 1):
+            self.interactive += 1
+            if row.get('AuthenticationRequirement') == 'multiFactorAuthentication':
+                self.interactive_mfa += 1
+        if str(row.get('RiskLevelDuringSignIn', '')).lower() == 'high':
+            self.high_risk += 1
+        if row.get('IPAddress'):
+            self.ips[row['IPAddress']] += 1
+        if row.get('Location'):
+            self.locations.add(row['Location'])
+
+        device = ' / '.join(part for part in (row.get('DeviceName'), row.get('OperatingSystem')) if part)
+        if device:
+            self.devices.add(device)
+
+    def risk_level(self, failed):
+        """
+        Return the overall risk level.
+
+        Args:
+            failed (int): Failed sign-ins
+
+        Returns:
+            str: 'High', 'Medium', 'Low' or 'Unknown'
+        """
+        if not self.total:
+            return 'Unknown'
+        if failed > 5:
+            return 'High'
+        if failed >= 3 or len(self.locations) > 3:
+            return 'Medium'
+        return 'Low'
+
+    def result(self, account, lookback_hours):
+        """
+        Build the analysis data.
+
+        Args:
+            account (str): User principal name
+            lookback_hours (int): Query window in hours
+
+        Returns:
+            dict: Analysis data in the Logic App "full" format
+        """
+        failed = self.total - self.successful
+        mfa_percentage = round(100 * self.interactive_mfa / self.interactive) if self.interactive else 0
+        risk_level = self.risk_level(failed)
+
+        now = datetime.now(timezone.utc)
+        return {
+            'account': account,
+            'analysis_period': {
+                'start_date': (now - timedelta(hours=lookback_hours)).isoformat(),
+                'end_date': now.isoformat(),
+                'report_generated': now.isoformat()
+            },
+            'summary_metrics': {
+                'total_signins': self.total,
+                'successful_signins': self.successful,
+                'failed_signins': failed,
+                'unique_ip_addresses': len(self.ips),
+                'unique_locations': len(self.locations),
+                'unique_devices': len(self.devices)
+            },
+            'authentication_details': {
+                'interactive_signins': self.interactive,
+                'non_interactive_signins': self.total - self.interactive,
+                'mfa_usage_percentage': mfa_percentage,
+                'high_risk_signins': self.high_risk
+            },
+            'risk_assessment': {
+                'overall_risk_level': risk_level
+            },
+            'geographic_analysis': {
+                'countries': sorted(self.locations)
+            },
+            'ip_address_analysis': [[ip, count] for ip, count in self.ips.most_common()],
+            'device_analysis': sorted(self.devices),
+            'anomalies': {
+                'status': 'Not evaluated by the direct Log Analytics backend'
+            },
+            'recent_activity': {
+                'events_captured': self.total,
+                'query_to_view_details': (
+                    f'union SigninLogs, AADNonInteractiveUserSignInLogs '
+                    f'| where TimeGenerated > ago({int(lookback_hours)}h) '
+                    f'| where UserPrincipalName =~ {kql_string(account)}'
+                )
+            }
+        }
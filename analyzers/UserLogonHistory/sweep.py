@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Offline bulk sweep for the User Logon History Analyzer.
+
+Runs the analyzer's retrieval (including tiered lookback when configured),
+summary() and artifacts() logic over a file of mailboxes outside of Cortex,
+for retroactive hunts across many accounts.
+
+- Input is streamed one mailbox per line (blank lines and # comments are skipped)
+- Mailboxes are processed concurrently, optionally capped at a rate of
+  outgoing requests (every Logic App call, token request and query page)
+- Results are appended to an NDJSON file as they complete
+- A checkpoint file records finished input lines so an interrupted sweep
+  resumes without repeating them; failed mailboxes are retried on the next run
+
+Memory use is constant: only a bounded window of mailboxes is in flight and
+the checkpoint stores a line watermark plus the few lines completed ahead of it
+and the lines that failed.
+
+Usage:
+    python sweep.py --config config.json --input mailboxes.txt \\
+        --output results.ndjson --checkpoint results.ckpt --workers 4 --rate 2
+
+The config file holds the same keys as the Cortex configuration
+(api_url, api_signature, timeout, verify_ssl, tiered_lookback, ...).
+
+Author: Brightspeed CIRT Team
+License: AGPL-V3
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, ALL_COMPLETED, FIRST_COMPLETED
+
+# Add common module to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from userlogonhistory import UserLogonHistoryAnalyzer
+from common.logging_utils import LogPipeline, log_context
+from common.utils import DataValidator
+
+
+class SweepError(Exception):
+    """Raised instead of exiting when the analyzer reports an error."""
+
+
+class OfflineLogonHistoryAnalyzer(UserLogonHistoryAnalyzer):
+    """
+    UserLogonHistoryAnalyzer configured from a dict instead of a Cortex job.
+
+    The Cortex worker constructor reads job input from disk or stdin and
+    exits on error; neither fits a sweep, so the input it would have loaded
+    is built here and error() raises SweepError instead. before_request()
+    waits on a RateLimiter shared by all sweep threads.
+
+    All sweep threads also share one APIClient. Its requests.Session is only
+    used for independent requests (headers are fixed when it is built), and
+    its connection pool is sized to the worker count so that no thread has
+    to open a connection the pool would then discard.
+    """
+
+    def __init__(self, config, tlp=2, pap=2, rate=None, workers=4):
+        """
+        Initialize from a configuration dict.
+
+        Args:
+            config (dict): Analyzer configuration (api_url, api_signature, ...)
+            tlp (int): TLP level sent with each query (default: 2)
+            pap (int): PAP level sent with each query (default: 2)
+            rate (float): Maximum outgoing requests per second, None for unlimited
+            workers (int): Threads sharing the HTTP client (default: 4)
+        """
+        self._input = {'dataType': 'mail', 'tlp': tlp, 'pap': pap, 'config': config}
+        self.job_directory = None
+        self.data_type = 'mail'
+        self.tlp = tlp
+        self.pap = pap
+        self.auto_extract = False
+        self.service_name = config.get('service', 'UserLogonHistory_BSCustom')
+        self.logger = logging.getLogger(UserLogonHistoryAnalyzer.__name__)
+        self.limiter = RateLimiter(rate)
+        self.http_pool_size = max(workers, self.http_pool_size)
+
+        self.load_config()
+
+    def before_request(self):
+        """Wait for the shared rate limiter before each outgoing request."""
+        self.limiter.wait()
+
+    def error(self, message, ensure_ascii=False):
+        """Raise SweepError instead of writing a Cortex error report and exiting."""
+        raise SweepError(message)
+
+
+class RateLimiter:
+    """
+    Space out calls to at most `rate` per second across all threads.
+
+    Attributes:
+        interval (float): Minimum seconds between calls (0 disables limiting)
+    """
+
+    def __init__(self, rate):
+        """
+        Initialize the limiter.
+
+        Args:
+            rate (float): Maximum calls per second, 0 or None for unlimited
+        """
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block until the caller may proceed."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class Checkpoint:
+    """
+    Track which input lines are finished.
+
+    Lines 1..watermark are all done; `ahead` holds lines that completed out
+    of order past the watermark, so its size is bounded by the in-flight
+    window. Lines whose mailbox failed move the watermark on like finished
+    ones but are also kept in `failed`, and are not done until a later run
+    succeeds with them.
+
+    Attributes:
+        path (str): Checkpoint file path
+        input_path (str): Input file the checkpoint belongs to
+        watermark (int): Highest line number with all previous lines done
+        failed (set): Line numbers to retry on the next run
+    """
+
+    def __init__(self, path, input_path):
+        """
+        Load the checkpoint, or start a new one.
+
+        Args:
+            path (str): Checkpoint file path
+            input_path (str): Input file being swept
+
+        Raises:
+            SweepError: If the checkpoint belongs to a different input file
+        """
+        self.path = path
+        self.input_path = os.path.abspath(input_path)
+        self.watermark = 0
+        self.ahead = set()
+        self.failed = set()
+
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('input') != self.input_path:
+                raise SweepError(f'Checkpoint {path} belongs to {state.get("input")}, not {self.input_path}')
+            self.watermark = state.get('watermark', 0)
+            self.ahead = set(state.get('ahead', []))
+            self.failed = set(state.get('failed', []))
+
+    def is_done(self, line_no):
+        """Return True if the line was finished in an earlier run."""
+        return (line_no <= self.watermark or line_no in self.ahead) and line_no not in self.failed
+
+    def mark_done(self, line_no):
+        """Record a finished line and advance the watermark."""
+        self.failed.discard(line_no)
+        self._advance(line_no)
+
+    def mark_failed(self, line_no):
+        """Record a line to retry on the next run and advance the watermark."""
+        self.failed.add(line_no)
+        self._advance(line_no)
+
+    def _advance(self, line_no):
+        """Add a line to the finished ones, moving the watermark past it if possible."""
+        if line_no <= self.watermark:
+            return
+        self.ahead.add(line_no)
+        while self.watermark + 1 in self.ahead:
+            self.watermark += 1
+            self.ahead.remove(self.watermark)
+
+    def save(self):
+        """Atomically write the checkpoint file."""
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'input': self.input_path,
+                'watermark': self.watermark,
+                'ahead': sorted(self.ahead),
+                'failed': sorted(self.failed)
+            }, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+def process_mailbox(analyzer, line_no, mailbox, include_full):
+    """
+    Analyze one mailbox and build its output record.
+
+    Args:
+        analyzer (OfflineLogonHistoryAnalyzer): Configured analyzer
+        line_no (int): Input line number
+        mailbox (str): Mailbox to analyze
+        include_full (bool): Include the full analysis data in the record
+
+    Returns:
+        dict: NDJSON output record
+    """
+    with log_context(observable=mailbox, line=line_no):
+        record = {'line': line_no, 'account': mailbox}
+
+        if not DataValidator.is_valid_email(mailbox):
+            record.update(success=False, error=f'Invalid email format: {mailbox}')
+            return record
+
+        try:
+            data = analyzer.retrieve_analysis(mailbox)
+        except Exception as e:
+            analyzer.logger.error('Error during analysis: %s', e)
+            record.update(success=False, error=str(e))
+            return record
+
+        record.update(
+            success=True,
+            summary=analyzer.summary(data),
+            artifacts=analyzer.artifacts(data)
+        )
+        if include_full:
+            record['full'] = data
+        return record
+
+
+def iter_mailboxes(path):
+    """
+    Stream (line number, mailbox) pairs from the input file.
+
+    Blank lines and # comments are yielded with mailbox None so that they
+    still count toward the checkpoint watermark.
+
+    Args:
+        path (str): Input file path
+
+    Yields:
+        tuple: (line_no, mailbox or None)
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            mailbox = line.strip()
+            if not mailbox or mailbox.startswith('#'):
+                yield line_no, None
+            else:
+                yield line_no, mailbox
+
+
+def sweep(analyzer, input_path, output_path, checkpoint, workers=4, include_full=True):
+    """
+    Run the sweep, appending results to output_path as they complete.
+
+    Args:
+        analyzer (OfflineLogonHistoryAnalyzer): Configured analyzer
+        input_path (str): File with one mailbox per line
+        output_path (str): NDJSON output file (appended to)
+        checkpoint (Checkpoint): Checkpoint for resume
+        workers (int): Concurrent queries (default: 4)
+        include_full (bool): Include the full analysis data in each record
+
+    Returns:
+        dict: Counts of succeeded, failed and skipped mailboxes
+    """
+    logger = logging.getLogger('sweep')
+    window = workers * 2
+    stats = {'succeeded': 0, 'failed': 0, 'skipped': 0}
+
+    with open(output_path, 'a', encoding='utf-8') as out, ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+
+        def drain(return_when):
+            done, _ = wait(pending, return_when=return_when)
+            for future in done:
+                record = future.result()
+                out.write(json.dumps(record, default=str) + '\n')
+                # Forget the future as soon as its record is written, so a
+                # drain cut short by Ctrl-C never writes it a second time
+                pending.discard(future)
+                # An invalid address fails the same way every time; anything
+                # else (timeouts, throttling, backend errors) is retried
+                if record['success'] or not DataValidator.is_valid_email(record['account']):
+                    checkpoint.mark_done(record['line'])
+                else:
+                    checkpoint.mark_failed(record['line'])
+                stats['succeeded' if record['success'] else 'failed'] += 1
+            # Results must be durable before the checkpoint claims them
+            out.flush()
+            os.fsync(out.fileno())
+            checkpoint.save()
+
+            processed = stats['succeeded'] + stats['failed']
+            if done and processed % 100 < len(done):
+                logger.info('Processed %d mailboxes (%d failed)', processed, stats['failed'])
+
+        try:
+            for line_no, mailbox in iter_mailboxes(input_path):
+                if checkpoint.is_done(line_no):
+                    if mailbox:
+                        stats['skipped'] += 1
+                    continue
+                if mailbox is None:
+                    checkpoint.mark_done(line_no)
+                    continue
+
+                pending.add(pool.submit(process_mailbox, analyzer, line_no, mailbox, include_full))
+                if len(pending) >= window:
+                    drain(FIRST_COMPLETED)
+
+            while pending:
+                drain(FIRST_COMPLETED)
+
+        except KeyboardInterrupt:
+            logger.warning('Interrupted; waiting for in-flight mailboxes before saving checkpoint')
+            for future in list(pending):
+                if future.cancel():
+                    pending.discard(future)
+            # Writes the records still in flight (and only those), then saves
+            drain(ALL_COMPLETED)
+            raise
+
+    return stats
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description='Sweep logon history for many mailboxes outside of Cortex.')
+    parser.add_argument('--config', required=True, help='JSON file with analyzer configuration')
+    parser.add_argument('--input', required=True, help='File with one mailbox per line')
+    parser.add_argument('--output', required=True, help='NDJSON results file (appended to)')
+    parser.add_argument('--checkpoint', help='Checkpoint file (default: <output>.ckpt)')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent queries (default: 4)')
+    parser.add_argument('--rate', type=float, default=None, help='Maximum outgoing requests per second (default: unlimited)')
+    parser.add_argument('--tlp', type=int, default=2, help='TLP level sent with each query (default: 2)')
+    parser.add_argument('--pap', type=int, default=2, help='PAP level sent with each query (default: 2)')
+    parser.add_argument('--no-full', action='store_true', help='Omit the full analysis data from records')
+    parser.add_argument('--log-format', choices=['json', 'text'], default='json', help='Log format (default: json)')
+    args = parser.parse_args(argv)
+
+    pipeline = LogPipeline(fmt=args.log_format, context={'service': 'UserLogonHistory_BSCustom', 'mode': 'sweep'})
+    pipeline.start()
+    logger = logging.getLogger('sweep')
+
+    try:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+
+        analyzer = OfflineLogonHistoryAnalyzer(config, tlp=args.tlp, pap=args.pap, rate=args.rate,
+                                               workers=args.workers)
+        checkpoint = Checkpoint(args.checkpoint or f'{args.output}.ckpt', args.input)
+        if checkpoint.watermark or checkpoint.ahead:
+            logger.info('Resuming after input line %d', checkpoint.watermark)
+
+        stats = sweep(
+            analyzer,
+            args.input,
+            args.output,
+            checkpoint,
+            workers=args.workers,
+            include_full=not args.no_full
+        )
+        logger.info('Sweep complete: %d succeeded, %d failed, %d skipped (already done)',
+                    stats['succeeded'], stats['failed'], stats['skipped'])
+        return 0
+
+    except KeyboardInterrupt:
+        logger.warning('Sweep interrupted; rerun the same command to resume')
+        return 130
+    except (SweepError, OSError, ValueError) as e:
+        logger.error('Sweep failed: %s', e)
+        return 1
+    finally:
+        pipeline.stop()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for Azure AD and the Log Analytics query API.
+
+Serves a client-credentials token endpoint and a workspace query endpoint
+returning generated sign-in rows. Keyset pagination is emulated by reading
+the page_size / cursor_time / cursor_id let statements from the KQL, so
+the analyzer's paging loop is exercised end to end.
+
+user@example.com gets row_count generated rows; the accounts in PROFILES
+get small fixed histories, one per overall risk level. Malformed queries
+are rejected with a 400 and a Log Analytics style error body, including
+queries that use DeviceDetail after unioning the two sign-in tables (the
+column has a different type in each, so the real service renames it).
+
+Usage:
+    python3 mock_log_analytics.py [port] [row_count]
+"""
+
+import json
+import re
+import sys
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+TOKEN = 'mock-access-token'
+ACCOUNT = 'user@example.com'
+
+# Accounts with a fixed history: (sign-ins, failed sign-ins, countries)
+PROFILES = {
+    'high@example.com': (20, 6, ['US']),
+    'medium@example.com': (20, 3, ['US']),
+    'travel@example.com': (20, 0, ['US', 'CA', 'GB', 'DE']),
+    'low@example.com': (20, 2, ['US', 'CA']),
+    'unknown@example.com': (0, 0, ['US'])
+}
+
+COLUMNS = [
+    ('TimeGenerated', 'datetime'), ('Id', 'string'), ('ResultType', 'string'),
+    ('IPAddress', 'string'), ('Location', 'string'), ('DeviceName', 'string'),
+    ('OperatingSystem', 'string'), ('RiskLevelDuringSignIn', 'string'),
+    ('AuthenticationRequirement', 'string'), ('IsInteractive', 'bool')
+]
+
+
+def generate_rows(count):
+    """Generate sign-in rows, newest first."""
+    now = datetime(2025, 10, 30, tzinfo=timezone.utc)
+    ips = ['64.53.89.127', '75.90.212.165', '20.85.226.166']
+    rows = []
+    for i in range(count):
+        # Pairs of rows share a timestamp to exercise the Id tie-breaker
+        timestamp = (now - timedelta(minutes=10 * (i // 2))).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+        rows.append([
+            timestamp,
+            f'id-{i:06d}',
+            '50126' if i % 25 == 0 else '0',
+            ips[i % len(ips)],
+            'US' if i % 10 else 'CA',
+            f'LAPTOP-{i % 4}',
+            'Windows 11',
+            'none',
+            'multiFactorAuthentication' if i % 3 else 'singleFactorAuthentication',
+            i % 2 == 0
+        ])
+    rows.sort(key=lambda row: (row[0], row[1]), reverse=True)
+    return rows
+
+
+def generate_profile_rows(count, failed, countries):
+    """
+    Generate a fixed history, newest first.
+
+    Interactive sign-ins (even rows) use MFA and non-interactive ones do
+    not, so MFA usage over interactive sign-ins is 100%.
+    """
+    now = datetime(2025, 10, 30, tzinfo=timezone.utc)
+    rows = []
+    for i in range(count):
+        interactive = i % 2 == 0
+        rows.append([
+            (now - timedelta(minutes=10 * i)).strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+            f'id-{i:06d}',
+            '50126' if i < failed else '0',
+            '64.53.89.127',
+            countries[i % len(countries)],
+            'LAPTOP-0',
+            'Windows 11',
+            'none',
+            'multiFactorAuthentication' if interactive else 'singleFactorAuthentication',
+            interactive
+        ])
+    return rows
+
+
+def kql_error(kql):
+    """
+    Return the error Log Analytics would report for a query, or None.
+
+    Only the mistakes this mock can detect are checked: a missing account
+    and DeviceDetail used after the union, where it no longer exists.
+
+    Args:
+        kql (str): Query text
+
+    Returns:
+        str: Error message, or None if the query is accepted
+    """
+    if not re.search(r'let account = (".*?");', kql):
+        return 'The request had some invalid properties'
+    union = re.search(r'^union\b', kql, re.M)
+    if union:
+        # The union's operands run until its first pipe at line start
+        rest = kql[union.start():].split('\n|', 1)
+        if len(rest) > 1 and 'DeviceDetail' in rest[1]:
+            return "Failed to resolve scalar expression named 'DeviceDetail'"
+        for table in ('SigninLogs', 'AADNonInteractiveUserSignInLogs'):
+            if not re.search(rf'\(\s*{table}\s*\|\s*extend Device\s*=', rest[0]):
+                return "Failed to resolve scalar expression named 'Device'"
+    return None
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Token and query endpoints."""
+
+    accounts = {}
+    queries = 0
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        raw = self.rfile.read(length).decode('utf-8')
+
+        if self.path.endswith('/oauth2/v2.0/token'):
+            form = parse_qs(raw)
+            if form.get('grant_type') != ['client_credentials'] or form.get('client_secret') != ['mock-secret']:
+                return self._send(401, {'error': 'invalid_client'})
+            return self._send(200, {'access_token': TOKEN, 'expires_in': 3600, 'token_type': 'Bearer'})
+
+        if re.match(r'^/v1/workspaces/[^/]+/query$', self.path):
+            if self.headers.get('Authorization') != f'Bearer {TOKEN}':
+                return self._send(403, {'error': {'message': 'Forbidden'}})
+
+            kql = json.loads(raw)['query']
+            error = kql_error(kql)
+            if error:
+                return self._send(400, {'error': {'code': 'BadArgumentError', 'message': error}})
+            account = json.loads(re.search(r'let account = (".*?");', kql).group(1))
+            page_size = int(re.search(r'let page_size = (\d+);', kql).group(1))
+            cursor = re.search(r'let cursor_time = todatetime\((".*?")\);', kql)
+            cursor_id = json.loads(re.search(r'let cursor_id = (".*?");', kql).group(1))
+
+            rows = self.accounts.get(account.lower(), [])
+            if cursor:
+                cursor_time = json.loads(cursor.group(1))
+                rows = [row for row in rows if (row[0], row[1]) < (cursor_time, cursor_id)]
+
+            Handler.queries += 1
+            return self._send(200, {'tables': [{
+                'name': 'PrimaryResult',
+                'columns': [{'name': name, 'type': kind} for name, kind in COLUMNS],
+                'rows': rows[:page_size]
+            }]})
+
+        self._send(404, {'error': {'message': 'Not found'}})
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 18080
+    Handler.accounts = {account: generate_profile_rows(*profile) for account, profile in PROFILES.items()}
+    Handler.accounts[ACCOUNT] = generate_rows(int(sys.argv[2]) if len(sys.argv) > 2 else 250)
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    print(f'Mock Log Analytics listening on http://127.0.0.1:{port}', flush=True)
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the UserLogonHistory Logic App.
+
+Answers analysis requests with a small "full" result. Accounts whose local
+part starts with "risky" get failed sign-ins and a Medium risk level, every
+other account looks clean. The first request for an account whose local part
+starts with "flaky" fails with a 503, later ones succeed. Each request body is appended to a log file so
+tests can check what the analyzer sent (e.g. lookbackHours).
+
+Usage:
+    python3 mock_logic_app.py [port] [delay_seconds] [request_log]
+"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SIGNATURE = 'mock-signature'
+
+
+def analysis(account, lookback_hours):
+    """Build the "full" analysis data for an account."""
+    risky = account.split('@')[0].startswith('risky')
+    failed = 3 if risky else 0
+    return {
+        'account': account,
+        'analysis_period': {'lookback_hours': lookback_hours},
+        'summary_metrics': {
+            'total_signins': 20,
+            'successful_signins': 20 - failed,
+            'failed_signins': failed,
+            'unique_ip_addresses': 1,
+            'unique_locations': 1,
+            'unique_devices': 1
+        },
+        'authentication_details': {
+            'interactive_signins': 10,
+            'non_interactive_signins': 10,
+            'mfa_usage_percentage': 100,
+            'high_risk_signins': 0
+        },
+        'risk_assessment': {'overall_risk_level': 'Medium' if risky else 'Low'},
+        'ip_address_analysis': [['64.53.89.127', 20]]
+    }
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Logic App trigger endpoint."""
+
+    delay = 0.0
+    request_log = None
+    log_lock = threading.Lock()
+    flaky_seen = set()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length).decode('utf-8'))
+
+        if parse_qs(urlparse(self.path).query).get('sig') != [SIGNATURE]:
+            return self._send(401, {'error': {'message': 'Invalid signature'}})
+
+        if self.request_log:
+            with self.log_lock, open(self.request_log, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(request) + '\n')
+
+        time.sleep(self.delay)
+        account = request.get('data', '')
+        if account.split('@')[0].startswith('flaky'):
+            with self.log_lock:
+                first = account not in self.flaky_seen
+                self.flaky_seen.add(account)
+            if first:
+                return self._send(503, {'error': {'message': 'Service temporarily unavailable'}})
+        self._send(200, {'success': True, 'full': analysis(account, request.get('lookbackHours'))})
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 18081
+    Handler.delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    Handler.request_log = sys.argv[3] if len(sys.argv) > 3 else None
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    print(f'Mock Logic App listening on http://127.0.0.1:{port}', flush=True)
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+#!/bin/bash
+# UserLogonHistory Analyzer - Log Analytics Backend Test
+# Runs the analyzer with backend=log_analytics against a local stand-in
+# server (mock_log_analytics.py) and checks the aggregated results, the
+# overall risk level for each documented rule, that query and token
+# errors carry the service's error message, and that the sign-in query
+# normalises DeviceDetail before the union.
+
+# Colors for output
+RED='\033[0;31m'
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+BLUE='\033[0;34m'
+NC='\033[0m' # No Color
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+PORT=${MOCK_PORT:-18080}
+ROWS=250
+PAGE_SIZE=100
+
+echo -e "${BLUE}=========================================${NC}"
+echo -e "${BLUE}UserLogonHistory - Log Analytics Backend Test${NC}"
+echo -e "${BLUE}=========================================${NC}"
+echo ""
+
+# Start the stand-in server
+echo -e "${YELLOW}[STEP 1]${NC} Starting mock Log Analytics on port $PORT..."
+python3 "$SCRIPT_DIR/mock_log_analytics.py" "$PORT" "$ROWS" > /dev/null 2>&1 &
+MOCK_PID=$!
+JOB_DIR=$(mktemp -d)
+trap 'kill $MOCK_PID 2>/dev/null; rm -rf "$JOB_DIR"' EXIT
+
+for _ in $(seq 1 50); do
+    python3 -c "import socket; socket.create_connection(('127.0.0.1', $PORT), 0.2)" 2>/dev/null && break
+    sleep 0.1
+done
+echo ""
+
+# Build job input for an account and run the analyzer on it
+run_analyzer() {
+    local account="$1"
+    local job_dir="$2"
+    mkdir -p "$job_dir/input"
+    cat > "$job_dir/input/input.json" << EOF
+{
+  "data": "$account",
+  "dataType": "mail",
+  "tlp": 2,
+  "pap": 2,
+  "config": {
+    "service": "UserLogonHistory",
+    "backend": "log_analytics",
+    "workspace_id": "00000000-0000-0000-0000-000000000000",
+    "tenant_id": "mock-tenant",
+    "client_id": "mock-client",
+    "client_secret": "mock-secret",
+    "login_url": "http://127.0.0.1:$PORT",
+    "log_analytics_url": "http://127.0.0.1:$PORT",
+    "page_size": $PAGE_SIZE,
+    "timeout": 10,
+    "verify_ssl": false
+  }
+}
+EOF
+
+    python3 "$SCRIPT_DIR/../userlogonhistory.py" "$job_dir" 2> "$job_dir/stderr.log"
+    local exit_code=$?
+    if [ $exit_code -ne 0 ] || [ ! -f "$job_dir/output/output.json" ]; then
+        echo -e "${RED}❌ ANALYZER FAILED for $account (exit code $exit_code)${NC}"
+        cat "$job_dir/output/output.json" 2>/dev/null
+        tail -20 "$job_dir/stderr.log"
+        exit 1
+    fi
+}
+
+# Run the analyzer
+echo -e "${YELLOW}[STEP 2]${NC} Running analyzer ($ROWS sign-ins, page size $PAGE_SIZE)..."
+run_analyzer user@example.com "$JOB_DIR"
+echo ""
+
+# Check results
+echo -e "${YELLOW}[STEP 3]${NC} Checking results..."
+python3 - "$JOB_DIR/output/output.json" "$ROWS" << 'EOF'
+import json
+import sys
+
+output = json.load(open(sys.argv[1]))
+rows = int(sys.argv[2])
+full = output.get('full', {})
+metrics = full.get('summary_metrics', {})
+
+checks = [
+    ('success', output.get('success'), True),
+    ('total_signins (all pages streamed once)', metrics.get('total_signins'), rows),
+    ('failed_signins', metrics.get('failed_signins'), len(range(0, rows, 25))),
+    ('unique_ip_addresses', metrics.get('unique_ip_addresses'), 3),
+    ('unique_locations', metrics.get('unique_locations'), 2),
+    ('IP artifacts', len(output.get('artifacts', [])), 3),
+    ('taxonomies', len(output.get('summary', {}).get('taxonomies', [])), 10),
+]
+
+failed = 0
+for name, actual, expected in checks:
+    if actual == expected:
+        print(f'  ✅ {name}: {actual}')
+    else:
+        print(f'  ❌ {name}: expected {expected}, got {actual}')
+        failed += 1
+
+sys.exit(1 if failed else 0)
+EOF
+RESULT=$?
+echo ""
+
+# One account per documented risk rule (Risk Assessment in tests/README.md)
+echo -e "${YELLOW}[STEP 4]${NC} Checking the overall risk level rules..."
+for ACCOUNT in high medium travel low unknown; do
+    run_analyzer "$ACCOUNT@example.com" "$JOB_DIR/$ACCOUNT"
+done
+
+python3 - "$JOB_DIR" << 'EOF'
+import json
+import os
+import sys
+
+job_dir = sys.argv[1]
+
+
+def full(account):
+    with open(os.path.join(job_dir, account, 'output', 'output.json'), encoding='utf-8') as f:
+        return json.load(f).get('full', {})
+
+
+def risk(account):
+    return full(account).get('risk_assessment', {}).get('overall_risk_level')
+
+
+checks = [
+    ('High: more than 5 failed sign-ins', risk('high'), 'High'),
+    ('Medium: 3-5 failed sign-ins', risk('medium'), 'Medium'),
+    ('Medium: more than 3 countries', risk('travel'), 'Medium'),
+    ('Low: 2 failed sign-ins from 2 countries', risk('low'), 'Low'),
+    ('Unknown: no sign-ins', risk('unknown'), 'Unknown'),
+    ('MFA usage counts interactive sign-ins only',
+     full('low').get('authentication_details', {}).get('mfa_usage_percentage'), 100),
+]
+
+failed = 0
+for name, actual, expected in checks:
+    if actual == expected:
+        print(f'  ✅ {name}: {actual}')
+    else:
+        print(f'  ❌ {name}: expected {expected}, got {actual}')
+        failed += 1
+
+sys.exit(1 if failed else 0)
+EOF
+[ $? -eq 0 ] || RESULT=1
+echo ""
+
+# Service error messages must survive APIClient's raise_for_status()
+echo -e "${YELLOW}[STEP 5]${NC} Checking query and token error messages..."
+python3 - "$SCRIPT_DIR/.." "$PORT" << 'EOF'
+import os
+import sys
+
+sys.path.insert(0, sys.argv[1])
+sys.path.insert(0, os.path.join(sys.argv[1], '..', '..'))
+from log_analytics import LogAnalyticsClient, LogAnalyticsError
+from common.utils import APIClient
+
+base_url = f'http://127.0.0.1:{sys.argv[2]}'
+
+
+def error_message(client_secret):
+    client = LogAnalyticsClient(APIClient(timeout=10), 'workspace', 'mock-tenant', 'mock-client', client_secret,
+                                login_url=base_url, api_url=base_url)
+    try:
+        client.query('SigninLogs | take 1')
+    except LogAnalyticsError as e:
+        return str(e)
+    return None
+
+
+checks = [
+    ('400 query error', error_message('mock-secret'),
+     'Log Analytics query failed: The request had some invalid properties'),
+    ('401 token error', error_message('wrong-secret'), 'Token request failed: invalid_client'),
+]
+
+failed = 0
+for name, actual, expected in checks:
+    if actual == expected:
+        print(f'  ✅ {name}: {actual}')
+    else:
+        print(f'  ❌ {name}: expected {expected}, got {actual}')
+        failed += 1
+
+sys.exit(1 if failed else 0)
+EOF
+[ $? -eq 0 ] || RESULT=1
+echo ""
+
+# DeviceDetail has a different type in each sign-in table
+echo -e "${YELLOW}[STEP 6]${NC} Checking the sign-in query..."
+python3 - "$SCRIPT_DIR" << 'EOF'
+import sys
+
+sys.path.insert(0, sys.argv[1])
+sys.path.insert(0, f'{sys.argv[1]}/..')
+sys.path.insert(0, f'{sys.argv[1]}/../../..')
+from log_analytics import SIGNIN_QUERY, kql_string
+from mock_log_analytics import kql_error
+
+kql = SIGNIN_QUERY.format(account=kql_string('user@example.com'), page_size=100,
+                          cursor_time='datetime(null)', cursor_id=kql_string(''))
+union_operands, pipeline = kql[kql.index('union'):].split('\n|', 1)
+# The query as it was before: DeviceDetail read after a plain union
+plain_union = kql.replace(union_operands, 'union SigninLogs, AADNonInteractiveUserSignInLogs').replace(
+    '| project', '| extend Device = todynamic(DeviceDetail)\n| project')
+
+checks = [
+    ('each table extends Device before the union',
+     ('(SigninLogs | extend Device = DeviceDetail)' in union_operands,
+      '(AADNonInteractiveUserSignInLogs | extend Device = todynamic(DeviceDetail))' in union_operands),
+     (True, True)),
+    ('DeviceDetail not used after the union', 'DeviceDetail' in pipeline, False),
+    ('query accepted by the mock', kql_error(kql), None),
+    ('mock rejects DeviceDetail after a plain union', kql_error(plain_union),
+     "Failed to resolve scalar expression named 'DeviceDetail'"),
+]
+
+failed = 0
+for name, actual, expected in checks:
+    if actual == expected:
+        print(f'  ✅ {name}: {actual}')
+    else:
+        print(f'  ❌ {name}: expected {expected}, got {actual}')
+        failed += 1
+
+sys.exit(1 if failed else 0)
+EOF
+[ $? -eq 0 ] || RESULT=1
+echo ""
+
+if [ $RESULT -eq 0 ]; then
+    echo -e "${GREEN}SUCCESS! Log Analytics backend is working correctly.${NC}"
+else
+    echo -e "${RED}❌ Log Analytics backend test failed${NC}"
+fi
+exit $RESULT
@@ -0,0 +1,210 @@
+#!/bin/bash
+# UserLogonHistory Analyzer - Sweep Resume Test
+# Runs sweep.py against a local stand-in Logic App (mock_logic_app.py),
+# interrupts it with SIGINT, resumes it, and checks that the NDJSON output
+# holds exactly one record per mailbox. A second sweep is interrupted inside
+# a drain, after records are written but before the checkpoint is saved.
+# A third sweep has mailboxes that fail once and checks they are retried on
+# the next run.
+
+# Colors for output
+RED='\033[0;31m'
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+BLUE='\033[0;34m'
+NC='\033[0m' # No Color
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+PORT=${MOCK_PORT:-18081}
+MAILBOXES=40
+DELAY=0.2
+
+echo -e "${BLUE}=========================================${NC}"
+echo -e "${BLUE}UserLogonHistory - Sweep Resume Test${NC}"
+echo -e "${BLUE}=========================================${NC}"
+echo ""
+
+# Start the stand-in server
+echo -e "${YELLOW}[STEP 1]${NC} Starting mock Logic App on port $PORT (${DELAY}s per request)..."
+python3 "$SCRIPT_DIR/mock_logic_app.py" "$PORT" "$DELAY" > /dev/null 2>&1 &
+MOCK_PID=$!
+WORK_DIR=$(mktemp -d)
+trap 'kill $MOCK_PID 2>/dev/null; rm -rf "$WORK_DIR"' EXIT
+
+for _ in $(seq 1 50); do
+    python3 -c "import socket; socket.create_connection(('127.0.0.1', $PORT), 0.2)" 2>/dev/null && break
+    sleep 0.1
+done
+
+cat > "$WORK_DIR/config.json" << EOF
+{
+  "api_url": "http://127.0.0.1:$PORT/workflows/mock/triggers/manual/paths/invoke?api-version=2016-10-01",
+  "api_signature": "mock-signature",
+  "timeout": 10,
+  "verify_ssl": false
+}
+EOF
+
+{
+    echo "# mailboxes to sweep"
+    for i in $(seq 1 $MAILBOXES); do
+        echo "user$i@example.com"
+        [ $((i % 10)) -eq 0 ] && echo ""
+    done
+} > "$WORK_DIR/mailboxes.txt"
+echo ""
+
+SWEEP=(python3 "$SCRIPT_DIR/../sweep.py" --config "$WORK_DIR/config.json" --input "$WORK_DIR/mailboxes.txt"
+       --output "$WORK_DIR/results.ndjson" --workers 4 --no-full)
+
+# Interrupt the first run part way through
+echo -e "${YELLOW}[STEP 2]${NC} Running sweep and sending SIGINT after 1s..."
+timeout --preserve-status -s INT 1 "${SWEEP[@]}" 2> "$WORK_DIR/first.log"
+FIRST_EXIT=$?
+FIRST_RECORDS=$(wc -l < "$WORK_DIR/results.ndjson")
+echo "  exit code $FIRST_EXIT, $FIRST_RECORDS records written"
+echo ""
+
+# Resume
+echo -e "${YELLOW}[STEP 3]${NC} Resuming sweep..."
+"${SWEEP[@]}" 2> "$WORK_DIR/second.log"
+SECOND_EXIT=$?
+echo "  exit code $SECOND_EXIT"
+echo ""
+
+# Interrupt again, this time while a drain is writing records
+echo -e "${YELLOW}[STEP 4]${NC} Interrupting inside a drain (after records are written)..."
+python3 - "$SCRIPT_DIR/.." "$WORK_DIR" 2> "$WORK_DIR/drain.log" << 'EOF'
+import json
+import os
+import sys
+
+sys.path.insert(0, sys.argv[1])
+from sweep import Checkpoint, OfflineLogonHistoryAnalyzer, sweep
+
+work_dir = sys.argv[2]
+input_path = os.path.join(work_dir, 'mailboxes.txt')
+output_path = os.path.join(work_dir, 'drain.ndjson')
+with open(os.path.join(work_dir, 'config.json'), encoding='utf-8') as f:
+    analyzer = OfflineLogonHistoryAnalyzer(json.load(f))
+
+
+class InterruptedCheckpoint(Checkpoint):
+    """Raise KeyboardInterrupt on the first save, as a Ctrl-C there would."""
+
+    interrupted = False
+
+    def save(self):
+        if not self.interrupted:
+            self.interrupted = True
+            raise KeyboardInterrupt
+        super(InterruptedCheckpoint, self).save()
+
+
+# Interrupted run, then a resume from the checkpoint it saved
+for checkpoint_class in (InterruptedCheckpoint, Checkpoint):
+    try:
+        sweep(analyzer, input_path, output_path, checkpoint_class(f'{output_path}.ckpt', input_path),
+              workers=4, include_full=False)
+    except KeyboardInterrupt:
+        pass
+EOF
+echo ""
+
+# Mailboxes that fail are retried by the next run
+echo -e "${YELLOW}[STEP 5]${NC} Sweeping mailboxes that fail once, then running again..."
+{
+    echo "user1@example.com"
+    echo "flaky1@example.com"
+    echo "not-an-email"
+    echo "user2@example.com"
+    echo "flaky2@example.com"
+} > "$WORK_DIR/flaky.txt"
+FLAKY=(python3 "$SCRIPT_DIR/../sweep.py" --config "$WORK_DIR/config.json" --input "$WORK_DIR/flaky.txt"
+       --output "$WORK_DIR/flaky.ndjson" --workers 2 --no-full)
+for run in 1 2 3; do
+    "${FLAKY[@]}" 2> "$WORK_DIR/flaky$run.log"
+    wc -l < "$WORK_DIR/flaky.ndjson" > "$WORK_DIR/flaky$run.count"
+done
+echo ""
+
+# Check results
+echo -e "${YELLOW}[STEP 6]${NC} Checking results..."
+python3 - "$WORK_DIR" "$MAILBOXES" "$FIRST_EXIT" "$FIRST_RECORDS" "$SECOND_EXIT" << 'EOF'
+import json
+import os
+import sys
+from collections import Counter
+
+work_dir = sys.argv[1]
+mailboxes = int(sys.argv[2])
+first_exit, first_records, second_exit = int(sys.argv[3]), int(sys.argv[4]), int(sys.argv[5])
+
+with open(os.path.join(work_dir, 'results.ndjson'), encoding='utf-8') as f:
+    records = [json.loads(line) for line in f]
+with open(os.path.join(work_dir, 'mailboxes.txt'), encoding='utf-8') as f:
+    input_lines = sum(1 for _ in f)
+with open(os.path.join(work_dir, 'results.ndjson.ckpt'), encoding='utf-8') as f:
+    checkpoint = json.load(f)
+
+with open(os.path.join(work_dir, 'drain.ndjson'), encoding='utf-8') as f:
+    drain_records = [json.loads(line) for line in f]
+
+with open(os.path.join(work_dir, 'flaky.ndjson'), encoding='utf-8') as f:
+    flaky_records = [json.loads(line) for line in f]
+with open(os.path.join(work_dir, 'flaky.ndjson.ckpt'), encoding='utf-8') as f:
+    flaky_checkpoint = json.load(f)
+flaky_counts = [int(open(os.path.join(work_dir, f'flaky{run}.count')).read()) for run in (1, 2, 3)]
+# The last record for each line is its result
+flaky_results = {record['account']: record['success'] for record in flaky_records}
+
+counts = Counter(record['account'] for record in records)
+drain_counts = Counter(record['account'] for record in drain_records)
+expected = {f'user{i}@example.com' for i in range(1, mailboxes + 1)}
+
+checks = [
+    ('first run interrupted (exit 130)', first_exit, 130),
+    ('first run stopped part way', 0 < first_records < mailboxes, True),
+    ('resumed run completed (exit 0)', second_exit, 0),
+    ('records written', len(records), mailboxes),
+    ('every mailbox present', set(counts) == expected, True),
+    ('duplicate records', sorted(account for account, count in counts.items() if count > 1), []),
+    ('all records succeeded', all(record['success'] for record in records), True),
+    ('checkpoint watermark at last input line', (checkpoint['watermark'], checkpoint['ahead']), (input_lines, [])),
+    ('interrupted drain: every mailbox present', set(drain_counts) == expected, True),
+    ('interrupted drain: duplicate records',
+     sorted(account for account, count in drain_counts.items() if count > 1), []),
+    ('failures: first run failed the flaky mailboxes',
+     sorted(r['account'] for r in flaky_records[:flaky_counts[0]] if not r['success']),
+     ['flaky1@example.com', 'flaky2@example.com', 'not-an-email']),
+    ('failures: second run retried only the flaky mailboxes',
+     sorted(r['account'] for r in flaky_records[flaky_counts[0]:flaky_counts[1]]),
+     ['flaky1@example.com', 'flaky2@example.com']),
+    ('failures: every valid mailbox ends up succeeded',
+     flaky_results, {'user1@example.com': True, 'flaky1@example.com': True, 'not-an-email': False,
+                     'user2@example.com': True, 'flaky2@example.com': True}),
+    ('failures: third run had nothing left to do', flaky_counts[2], flaky_counts[1]),
+    ('failures: checkpoint has no failed lines left',
+     (flaky_checkpoint['watermark'], flaky_checkpoint['failed']), (5, [])),
+]
+
+failed = 0
+for name, actual, expected_value in checks:
+    if actual == expected_value:
+        print(f'  ✅ {name}: {actual}')
+    else:
+        print(f'  ❌ {name}: expected {expected_value}, got {actual}')
+        failed += 1
+
+sys.exit(1 if failed else 0)
+EOF
+RESULT=$?
+echo ""
+
+if [ $RESULT -eq 0 ]; then
+    echo -e "${GREEN}SUCCESS! Sweep resumes without duplicate records.${NC}"
+else
+    echo -e "${RED}❌ Sweep resume test failed${NC}"
+    tail -n 5 "$WORK_DIR/first.log" "$WORK_DIR/second.log" "$WORK_DIR/drain.log" "$WORK_DIR/flaky1.log"
+fi
+exit $RESULT
@@ -0,0 +1,136 @@
+#!/bin/bash
+# UserLogonHistory Analyzer - Tiered Lookback Test
+# Runs the analyzer with tiered_lookback against a local stand-in Logic App
+# (mock_logic_app.py): a clean account must stay on the triage window and a
+# risky account must escalate to the full lookback.
+
+# Colors for output
+RED='\033[0;31m'
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+BLUE='\033[0;34m'
+NC='\033[0m' # No Color
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+PORT=${MOCK_PORT:-18082}
+TRIAGE_HOURS=24
+FULL_DAYS=7
+
+echo -e "${BLUE}=========================================${NC}"
+echo -e "${BLUE}UserLogonHistory - Tiered Lookback Test${NC}"
+echo -e "${BLUE}=========================================${NC}"
+echo ""
+
+# Start the stand-in server
+echo -e "${YELLOW}[STEP 1]${NC} Starting mock Logic App on port $PORT..."
+WORK_DIR=$(mktemp -d)
+python3 "$SCRIPT_DIR/mock_logic_app.py" "$PORT" 0 "$WORK_DIR/requests.log" > /dev/null 2>&1 &
+MOCK_PID=$!
+trap 'kill $MOCK_PID 2>/dev/null; rm -rf "$WORK_DIR"' EXIT
+
+for _ in $(seq 1 50); do
+    python3 -c "import socket; socket.create_connection(('127.0.0.1', $PORT), 0.2)" 2>/dev/null && break
+    sleep 0.1
+done
+echo ""
+
+# Run the analyzer once per account
+STEP=2
+for ACCOUNT in clean@example.com risky@example.com; do
+    JOB_DIR="$WORK_DIR/${ACCOUNT%@*}"
+    mkdir -p "$JOB_DIR/input"
+    cat > "$JOB_DIR/input/input.json" << EOF
+{
+  "data": "$ACCOUNT",
+  "dataType": "mail",
+  "tlp": 2,
+  "pap": 2,
+  "config": {
+    "service": "UserLogonHistory",
+    "api_url": "http://127.0.0.1:$PORT/workflows/mock/triggers/manual/paths/invoke?api-version=2016-10-01",
+    "api_signature": "mock-signature",
+    "tiered_lookback": true,
+    "triage_lookback_hours": $TRIAGE_HOURS,
+    "full_lookback_days": $FULL_DAYS,
+    "timeout": 10,
+    "verify_ssl": false
+  }
+}
+EOF
+
+    echo -e "${YELLOW}[STEP $STEP]${NC} Running analyzer for $ACCOUNT..."
+    python3 "$SCRIPT_DIR/../userlogonhistory.py" "$JOB_DIR" 2> "$JOB_DIR/stderr.log"
+    EXIT_CODE=$?
+    if [ $EXIT_CODE -ne 0 ] || [ ! -f "$JOB_DIR/output/output.json" ]; then
+        echo -e "${RED}❌ ANALYZER FAILED (exit code $EXIT_CODE)${NC}"
+        cat "$JOB_DIR/output/output.json" 2>/dev/null
+        tail -20 "$JOB_DIR/stderr.log"
+        exit 1
+    fi
+    STEP=$((STEP + 1))
+done
+echo ""
+
+# Check results
+echo -e "${YELLOW}[STEP $STEP]${NC} Checking results..."
+python3 - "$WORK_DIR" "$TRIAGE_HOURS" "$FULL_DAYS" << 'EOF'
+import json
+import os
+import sys
+
+work_dir = sys.argv[1]
+triage_hours = int(sys.argv[2])
+full_hours = int(sys.argv[3]) * 24
+
+with open(os.path.join(work_dir, 'requests.log'), encoding='utf-8') as f:
+    requests_sent = [json.loads(line) for line in f]
+
+
+def lookback_hours_sent(account):
+    return [request.get('lookbackHours') for request in requests_sent if request.get('data') == account]
+
+
+def report(name):
+    with open(os.path.join(work_dir, name, 'output', 'output.json'), encoding='utf-8') as f:
+        output = json.load(f)
+    lookback = output.get('full', {}).get('lookback', {})
+    taxonomies = output.get('summary', {}).get('taxonomies', [])
+    taxonomy = [t['value'] for t in taxonomies if t.get('predicate') == 'Lookback']
+    return output, lookback, taxonomy
+
+
+clean, clean_lookback, clean_taxonomy = report('clean')
+risky, risky_lookback, risky_taxonomy = report('risky')
+
+checks = [
+    ('clean: success', clean.get('success'), True),
+    ('clean: lookbackHours sent', lookback_hours_sent('clean@example.com'), [triage_hours]),
+    ('clean: lookback tier', (clean_lookback.get('tier'), clean_lookback.get('hours')), ('triage', triage_hours)),
+    ('clean: escalation reasons', clean_lookback.get('escalation_reasons'), []),
+    ('clean: Lookback taxonomy', clean_taxonomy, [f'triage ({triage_hours}h)']),
+    ('risky: success', risky.get('success'), True),
+    ('risky: lookbackHours sent', lookback_hours_sent('risky@example.com'), [triage_hours, full_hours]),
+    ('risky: lookback tier', (risky_lookback.get('tier'), risky_lookback.get('hours')), ('full', full_hours)),
+    ('risky: escalation reasons', risky_lookback.get('escalation_reasons'), ['3 failed sign-ins', 'risk level Medium']),
+    ('risky: Lookback taxonomy', risky_taxonomy, [f'full ({full_hours}h)']),
+]
+
+failed = 0
+for name, actual, expected in checks:
+    if actual == expected:
+        print(f'  ✅ {name}: {actual}')
+    else:
+        print(f'  ❌ {name}: expected {expected}, got {actual}')
+        failed += 1
+
+sys.exit(1 if failed else 0)
+EOF
+RESULT=$?
+echo ""
+
+if [ $RESULT -eq 0 ]; then
+    echo -e "${GREEN}SUCCESS! Tiered lookback is working correctly.${NC}"
+else
+    echo -e "${RED}❌ Tiered lookback test failed${NC}"
+fi
+exit $RESULT
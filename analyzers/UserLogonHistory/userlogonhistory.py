@@ -2,8 +2,8 @@
 """
 User Logon History Analyzer for TheHive Cortex.
 
-Retrieves user logon history from Azure Logic App and formats
-results for TheHive with taxonomies and artifacts.
+Retrieves user logon history from Azure Logic App (or directly from
+Log Analytics) and formats results for TheHive with taxonomies and artifacts.
 
 Author: Brightspeed CIRT Team
 License: AGPL-V3
@@ -19,6 +19,12 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 from common.base_analyzer import BaseAnalyzer
 from common.utils import APIClient, DataValidator
 
+from log_analytics import LogAnalyticsClient, LogAnalyticsError, SigninAggregator
+
+
+class LogicAppError(Exception):
+    """Raised when the Logic App returns an unusable or failed response."""
+
 
 class UserLogonHistoryAnalyzer(BaseAnalyzer):
     """
@@ -27,8 +33,22 @@ class UserLogonHistoryAnalyzer(BaseAnalyzer):
     Queries Microsoft Sentinel via Logic App to retrieve 7-day
     authentication history including sign-ins, failures, IPs,
     locations, devices, and risk assessment.
+
+    In tiered mode a short triage window is queried first and the full
+    lookback is only requested when the triage result shows risk signals.
+
+    With backend 'log_analytics' the Logic App is bypassed: sign-in rows
+    are queried from the Log Analytics REST API page by page and
+    aggregated locally into the same structure.
     """
 
+    # Taxonomy colors for the Logic App's overall risk level
+    RISK_COLORS = {'High': 'malicious', 'Medium': 'suspicious', 'Low': 'safe'}
+
+    # Pooled HTTP connections per host; the offline sweep raises this to its
+    # worker count because all of its threads share self.client
+    http_pool_size = 10
+
     def __init__(self):
         """Initialize analyzer and validate configuration."""
         super(UserLogonHistoryAnalyzer, self).__init__()
@@ -37,10 +57,7 @@ class UserLogonHistoryAnalyzer(BaseAnalyzer):
         self.validate_tlp(max_tlp=2)
 
         # Get configuration
-        self.api_url = self.get_param('config.api_url', None, 'API URL is required')
-        self.api_signature = self.get_param('config.api_signature', None, 'API signature is required')
-        self.timeout = self.get_param('config.timeout', 60)
-        self.verify_ssl = self.get_param('config.verify_ssl', True)
+        self.load_config()
 
         # Get and validate email
         self.email = self.get_data()
@@ -48,66 +65,250 @@ class UserLogonHistoryAnalyzer(BaseAnalyzer):
         if not validator.is_valid_email(self.email):
             self.error(f'Invalid email format: {self.email}')
 
-        self.logger.info(f'Initialized for email: {self.email}')
+        self.logger.info('Initialized for email: %s', self.email)
 
-    def run(self):
+    def load_config(self):
+        """Read configuration parameters and build the HTTP client."""
+        self.backend = self.get_param('config.backend', 'logic_app')
+        if self.backend not in ('logic_app', 'log_analytics'):
+            self.error(f'Unknown backend: {self.backend}')
+
+        self.timeout = self.get_param('config.timeout', 60)
+        self.verify_ssl = self.get_param('config.verify_ssl', True)
+
+        # Tiered lookback (off by default: one query with the Logic App's default window)
+        self.tiered_lookback = self.get_param('config.tiered_lookback', False)
+        self.triage_lookback_hours = self.get_param('config.triage_lookback_hours', 24)
+        self.full_lookback_days = self.get_param('config.full_lookback_days', 7)
+        self.escalation_failed_signins = self.get_param('config.escalation_failed_signins', 1)
+
+        self.client = APIClient(
+            timeout=self.timeout,
+            verify_ssl=self.verify_ssl,
+            headers={
+                'Content-Type': 'application/json',
+                'Accept': 'application/json'
+            },
+            pool_size=self.http_pool_size
+        )
+
+        if self.backend == 'logic_app':
+            self.api_url = self.get_param('config.api_url', None, 'API URL is required')
+            self.api_signature = self.get_param('config.api_signature', None, 'API signature is required')
+        else:
+            self.log_analytics = LogAnalyticsClient(
+                self.client,
+                workspace_id=self.get_param('config.workspace_id', None, 'Workspace ID is required'),
+                tenant_id=self.get_param('config.tenant_id', None, 'Tenant ID is required'),
+                client_id=self.get_param('config.client_id', None, 'Client ID is required'),
+                client_secret=self.get_param('config.client_secret', None, 'Client secret is required'),
+                login_url=self.get_param('config.login_url', 'https://login.microsoftonline.com'),
+                api_url=self.get_param('config.log_analytics_url', 'https://api.loganalytics.io'),
+                page_size=self.get_param('config.page_size', 5000),
+                request_hook=self.before_request
+            )
+
+    def before_request(self):
         """
-        Main execution method.
+        Hook called before every outgoing backend request.
 
-        Calls Logic App, validates response, and reports data to Cortex.
-        The framework automatically calls summary() and artifacts().
+        Covers each Logic App call, Log Analytics token request and query
+        page, so tiered escalation and paging are all seen. Does nothing by
+        default; the offline sweep rate limits here.
         """
-        try:
-            self.logger.info(f'Retrieving logon history for: {self.email}')
-
-            # Build API URL with signature
-            api_url = f'{self.api_url}&sig={self.api_signature}'
-
-            # Initialize HTTP client
-            client = APIClient(
-                timeout=self.timeout,
-                verify_ssl=self.verify_ssl,
-                headers={
-                    'Content-Type': 'application/json',
-                    'Accept': 'application/json'
-                }
-            )
 
-            # Prepare request body
-            request_body = {
-                'dataType': 'mail',
-                'data': self.email,
-                'tlp': self.tlp,
-                'pap': self.pap
+    def fetch_logon_history(self, email, lookback_hours=None):
+        """
+        Retrieve logon history analysis for one mailbox from the configured backend.
+
+        Args:
+            email (str): Mailbox to analyze
+            lookback_hours (int): Query window in hours; None uses the
+                                  Logic App's default window, or
+                                  full_lookback_days for Log Analytics
+
+        Returns:
+            dict: Analysis data in the Logic App "full" format
+
+        Raises:
+            LogicAppError: If the Logic App response is invalid or reports failure
+            LogAnalyticsError: If a Log Analytics token or query request fails
+            requests.exceptions.RequestException: If the HTTP request fails
+        """
+        if self.backend == 'log_analytics':
+            return self.fetch_from_log_analytics(email, lookback_hours or self.full_lookback_days * 24)
+        return self.fetch_from_logic_app(email, lookback_hours)
+
+    def fetch_from_log_analytics(self, email, lookback_hours):
+        """
+        Query sign-in rows from Log Analytics and aggregate them locally.
+
+        Args:
+            email (str): Mailbox to analyze
+            lookback_hours (int): Query window in hours
+
+        Returns:
+            dict: Analysis data in the Logic App "full" format
+        """
+        self.logger.info('Querying Log Analytics (%dh window)...', lookback_hours)
+        aggregator = SigninAggregator()
+        for row in self.log_analytics.iter_signins(email, lookback_hours):
+            aggregator.add(row)
+
+        analysis_data = aggregator.result(email, lookback_hours)
+        self.logger.info('Aggregated %d sign-ins', aggregator.total)
+        return analysis_data
+
+    def fetch_from_logic_app(self, email, lookback_hours=None):
+        """
+        Retrieve logon history analysis for one mailbox from the Logic App.
+
+        Args:
+            email (str): Mailbox to analyze
+            lookback_hours (int): Query window in hours; None uses the
+                                  Logic App's default window
+
+        Returns:
+            dict: The "full" analysis data from the Logic App response
+        """
+        # Build API URL with signature
+        api_url = f'{self.api_url}&sig={self.api_signature}'
+
+        # Prepare request body
+        request_body = {
+            'dataType': 'mail',
+            'data': email,
+            'tlp': self.tlp,
+            'pap': self.pap
+        }
+        if lookback_hours is not None:
+            request_body['lookbackHours'] = lookback_hours
+
+        # Call Logic App
+        self.logger.info('Calling Logic App API...')
+        self.before_request()
+        response = self.client.post(api_url, data=request_body)
+
+        # Validate response format
+        if not isinstance(response, dict):
+            raise LogicAppError('Invalid response format from Logic App')
+
+        # Logic App returns: {success: true, full: {...}, summary: {...}, artifacts: [...]}
+        # We need to extract just the "full" data portion
+        if not response.get('success', False):
+            error_msg = response.get('error', 'Unknown error from Logic App')
+            raise LogicAppError(f'Logic App analysis failed: {error_msg}')
+
+        if 'full' not in response:
+            raise LogicAppError('Logic App response missing "full" data field')
+
+        # Extract the analysis data (not the wrapper)
+        analysis_data = response['full']
+
+        self.logger.info('Received analysis data with keys: %s', list(analysis_data.keys()))
+
+        return analysis_data
+
+    def retrieve_analysis(self, email):
+        """
+        Retrieve logon history, using the tiered lookback when enabled.
+
+        In tiered mode the triage window is queried first; the full lookback
+        is only queried when should_escalate() finds risk signals. The tier
+        that answered is recorded under the "lookback" key of the result.
+
+        Args:
+            email (str): Mailbox to analyze
+
+        Returns:
+            dict: Analysis data from the Logic App
+
+        Raises:
+            LogicAppError: If the Logic App response is invalid or reports failure
+            requests.exceptions.RequestException: If the HTTP request fails
+        """
+        if not self.tiered_lookback:
+            return self.fetch_logon_history(email)
+
+        analysis_data = self.fetch_logon_history(email, lookback_hours=self.triage_lookback_hours)
+        reasons = self.should_escalate(analysis_data)
+        if not reasons:
+            self.logger.info('Triage window clean; skipping full lookback')
+            analysis_data['lookback'] = {
+                'tier': 'triage',
+                'hours': self.triage_lookback_hours,
+                'escalation_reasons': []
             }
+            return analysis_data
+
+        self.logger.info('Escalating to full lookback: %s', ', '.join(reasons))
+        full_hours = self.full_lookback_days * 24
+        analysis_data = self.fetch_logon_history(email, lookback_hours=full_hours)
+        analysis_data['lookback'] = {
+            'tier': 'full',
+            'hours': full_hours,
+            'escalation_reasons': reasons
+        }
+        return analysis_data
+
+    def risk_signals(self, raw):
+        """
+        Extract the risk signals that summary() colors on.
+
+        Args:
+            raw (dict): Analysis data from Logic App
+
+        Returns:
+            dict: risk_level, failed_signins and high_risk_signins
+        """
+        return {
+            'risk_level': raw.get('risk_assessment', {}).get('overall_risk_level', 'Unknown'),
+            'failed_signins': raw.get('summary_metrics', {}).get('failed_signins', 0),
+            'high_risk_signins': raw.get('authentication_details', {}).get('high_risk_signins', 0)
+        }
 
-            # Call Logic App
-            self.logger.info('Calling Logic App API...')
-            response = client.post(api_url, data=request_body)
+    def should_escalate(self, raw):
+        """
+        Decide whether a triage result needs the full lookback.
 
-            # Validate response format
-            if not isinstance(response, dict):
-                self.error('Invalid response format from Logic App')
+        Escalates on failed sign-ins at or above escalation_failed_signins,
+        any high-risk sign-in, or a risk level that is not Low.
+
+        Args:
+            raw (dict): Triage analysis data from Logic App
 
-            # Logic App returns: {success: true, full: {...}, summary: {...}, artifacts: [...]}
-            # We need to extract just the "full" data portion
-            if not response.get('success', False):
-                error_msg = response.get('error', 'Unknown error from Logic App')
-                self.error(f'Logic App analysis failed: {error_msg}')
+        Returns:
+            list: Reasons for escalating (empty if the account looks clean)
+        """
+        signals = self.risk_signals(raw)
+        reasons = []
+        if signals['failed_signins'] >= self.escalation_failed_signins:
+            reasons.append(f'{signals["failed_signins"]} failed sign-ins')
+        if signals['high_risk_signins'] > 0:
+            reasons.append(f'{signals["high_risk_signins"]} high-risk sign-ins')
+        if signals['risk_level'] != 'Low':
+            reasons.append(f'risk level {signals["risk_level"]}')
+        return reasons
 
-            if 'full' not in response:
-                self.error('Logic App response missing "full" data field')
+    def run(self):
+        """
+        Main execution method.
 
-            # Extract the analysis data (not the wrapper)
-            analysis_data = response['full']
+        Calls Logic App, validates response, and reports data to Cortex.
+        The framework automatically calls summary() and artifacts().
+        """
+        try:
+            self.logger.info('Retrieving logon history for: %s', self.email)
 
-            self.logger.info(f'Received analysis data with keys: {list(analysis_data.keys())}')
+            analysis_data = self.retrieve_analysis(self.email)
 
             # Report the data - framework will call summary() and artifacts() automatically
             self.report(analysis_data)
 
+        except (LogicAppError, LogAnalyticsError) as e:
+            self.error(str(e))
         except Exception as e:
-            self.logger.error(f'Error during analysis: {str(e)}')
+            self.logger.error('Error during analysis: %s', e)
             self.error(f'Failed to retrieve logon history: {str(e)}')
 
     def summary(self, raw):
@@ -121,14 +322,16 @@ class UserLogonHistoryAnalyzer(BaseAnalyzer):
             raw (dict): Analysis data from Logic App
 
         Returns:
-            dict: {'taxonomies': [...]} with 10 taxonomy objects
+            dict: {'taxonomies': [...]} with 10 taxonomy objects, plus a
+                  Lookback taxonomy when tiered mode answered
         """
         taxonomies = []
 
         try:
             # Extract metrics from analysis data
             account = raw.get('account', 'Unknown')
-            risk_level = raw.get('risk_assessment', {}).get('overall_risk_level', 'Unknown')
+            signals = self.risk_signals(raw)
+            risk_level = signals['risk_level']
             metrics = raw.get('summary_metrics', {})
             auth = raw.get('authentication_details', {})
 
@@ -139,8 +342,7 @@ class UserLogonHistoryAnalyzer(BaseAnalyzer):
             )
 
             # 2. Risk Level (color based on risk)
-            risk_colors = {'High': 'malicious', 'Medium': 'suspicious', 'Low': 'safe'}
-            risk_color = risk_colors.get(risk_level, 'info')
+            risk_color = self.RISK_COLORS.get(risk_level, 'info')
             taxonomies.append(
                 self.build_taxonomy('UserLoginAnalysis', 'RiskLevel', risk_level, risk_color)
             )
@@ -158,7 +360,7 @@ class UserLogonHistoryAnalyzer(BaseAnalyzer):
             )
 
             # 5. Failed Sign-ins (color based on count)
-            failed = metrics.get('failed_signins', 0)
+            failed = signals['failed_signins']
             if failed > 5:
                 failed_color = 'malicious'
             elif failed > 0:
@@ -194,16 +396,24 @@ class UserLogonHistoryAnalyzer(BaseAnalyzer):
             )
 
             # 10. High Risk Sign-ins (color based on count)
-            high_risk = auth.get('high_risk_signins', 0)
+            high_risk = signals['high_risk_signins']
             high_risk_color = 'malicious' if high_risk > 0 else 'safe'
             taxonomies.append(
                 self.build_taxonomy('UserLoginAnalysis', 'HighRiskSignins', str(high_risk), high_risk_color)
             )
 
-            self.logger.info(f'Built {len(taxonomies)} taxonomies')
+            # 11. Lookback tier (info - blue), only in tiered mode
+            lookback = raw.get('lookback')
+            if lookback:
+                taxonomies.append(
+                    self.build_taxonomy('UserLoginAnalysis', 'Lookback',
+                                        f'{lookback["tier"]} ({lookback["hours"]}h)', 'info')
+                )
+
+            self.logger.info('Built %d taxonomies', len(taxonomies))
 
         except Exception as e:
-            self.logger.error(f'Error building taxonomies: {str(e)}')
+            self.logger.error('Error building taxonomies: %s', e)
             # Fallback - return error taxonomy
             taxonomies = [
                 self.build_taxonomy('UserLoginAnalysis', 'Status', 'Error', 'suspicious')
@@ -244,12 +454,12 @@ class UserLogonHistoryAnalyzer(BaseAnalyzer):
                     })
 
             if artifacts:
-                self.logger.info(f'Extracted {len(artifacts)} IP artifacts')
+                self.logger.info('Extracted %d IP artifacts', len(artifacts))
 
         except Exception as e:
-            self.logger.error(f'Error extracting artifacts: {str(e)}')
+            self.logger.error('Error extracting artifacts: %s', e)
 
-        return artifacts
+        return super(UserLogonHistoryAnalyzer, self).artifacts(raw) + artifacts
 
 
 if __name__ == '__main__':
@@ -6,13 +6,19 @@ This module provides reusable components for building analyzers and responders.
 
 from .base_analyzer import BaseAnalyzer
 from .base_responder import BaseResponder
-from .utils import APIClient, DataValidator
+from .utils import APIClient, DataValidator, HTTPCache
+from .logging_utils import LogPipeline, log_context
+from .profiling import JobProfiler
 
 __all__ = [
     'BaseAnalyzer',
     'BaseResponder',
     'APIClient',
-    'DataValidator'
+    'DataValidator',
+    'HTTPCache',
+    'LogPipeline',
+    'log_context',
+    'JobProfiler'
 ]
 
 __version__ = '1.0.0'
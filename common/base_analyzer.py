@@ -10,11 +10,11 @@ This module provides a base class that handles common analyzer functionality:
 """
 
 from cortexutils.analyzer import Analyzer
-import logging
-import sys
+from .logging_utils import JobLoggingMixin
+from .profiling import JobProfilingMixin
 
 
-class BaseAnalyzer(Analyzer):
+class BaseAnalyzer(JobProfilingMixin, JobLoggingMixin, Analyzer):
     """
     Base class for all custom Cortex analyzers.
 
@@ -28,6 +28,8 @@ class BaseAnalyzer(Analyzer):
         pap (int): Permissible Actions Protocol level (0-3)
     """
 
+    supports_profile_artifacts = True
+
     def __init__(self):
         """Initialize the base analyzer."""
         super(BaseAnalyzer, self).__init__()
@@ -36,14 +38,23 @@ class BaseAnalyzer(Analyzer):
         # Setup logging
         self.setup_logging()
 
-    def setup_logging(self):
-        """Configure logging for the analyzer."""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[logging.StreamHandler(sys.stderr)]
-        )
-        self.logger = logging.getLogger(self.__class__.__name__)
+        # Start opt-in profiling (no-op unless requested)
+        self.setup_profiling()
+
+    def get_log_context(self):
+        """
+        Return per-job fields attached to every log record.
+
+        Adds the observable to the common job fields.
+
+        Returns:
+            dict: Context fields
+        """
+        context = super(BaseAnalyzer, self).get_log_context()
+        observable = self.get_param('data')
+        if observable is not None:
+            context['observable'] = observable
+        return context
 
     def validate_tlp(self, max_tlp=2):
         """
@@ -148,7 +159,9 @@ class BaseAnalyzer(Analyzer):
         Extract artifacts from raw results.
 
         This method should be overridden by child classes to extract
-        observables (artifacts) from analysis results.
+        observables (artifacts) from analysis results. Overrides should
+        start from super().artifacts(raw), which holds the job profile
+        files when profile_output asks for them.
 
         Args:
             raw (dict): Raw analysis results
@@ -156,7 +169,7 @@ class BaseAnalyzer(Analyzer):
         Returns:
             list: List of artifact dictionaries
         """
-        return []
+        return list(self.profile_artifacts)
 
     def run(self):
         """
@@ -9,11 +9,11 @@ This module provides a base class that handles common responder functionality:
 """
 
 from cortexutils.responder import Responder
-import logging
-import sys
+from .logging_utils import JobLoggingMixin
+from .profiling import JobProfilingMixin
 
 
-class BaseResponder(Responder):
+class BaseResponder(JobProfilingMixin, JobLoggingMixin, Responder):
     """
     Base class for all custom Cortex responders.
 
@@ -32,14 +32,26 @@ class BaseResponder(Responder):
         # Setup logging
         self.setup_logging()
 
-    def setup_logging(self):
-        """Configure logging for the responder."""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[logging.StreamHandler(sys.stderr)]
-        )
-        self.logger = logging.getLogger(self.__class__.__name__)
+        # Start opt-in profiling (no-op unless requested)
+        self.setup_profiling()
+
+    def get_log_context(self):
+        """
+        Return per-job fields attached to every log record.
+
+        Adds the id of the TheHive object the responder acts on.
+
+        Returns:
+            dict: Context fields
+        """
+        context = super(BaseResponder, self).get_log_context()
+        # Responders receive a whole TheHive object; tag records with its id
+        data = self.get_param('data')
+        if isinstance(data, dict):
+            object_id = data.get('_id') or data.get('id')
+            if object_id is not None:
+                context['object_id'] = object_id
+        return context
 
     def check_required_params(self, params):
         """
@@ -0,0 +1,370 @@
+"""
+Logging pipeline for Cortex analyzers and responders.
+
+This module provides a non-blocking logging setup:
+- LogPipeline: Queue-based handler with a background writer thread
+- JSONFormatter: One JSON object per log record
+- JobContextFilter: Attaches per-job fields (job id, observable, ...) to records
+- RateLimitFilter: Suppresses bursts of repeated messages
+- log_context: Context manager adding fields to records for a block of work
+- JobLoggingMixin: Pipeline lifecycle shared by BaseAnalyzer and BaseResponder
+
+Records are enqueued without formatting; the message is only rendered by the
+writer thread, so use %-style arguments (logger.info('x=%s', x)) rather than
+f-strings to keep disabled and hot-path log calls cheap.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Any
+
+
+_job_context = contextvars.ContextVar('job_context', default={})
+
+
+@contextmanager
+def log_context(**fields):
+    """
+    Attach extra fields to every record logged inside the block.
+
+    Fields are scoped to the current thread/task, so concurrent workers
+    can each tag their records (e.g. with the observable being processed).
+
+    Args:
+        **fields: Fields to add to the record context
+    """
+    token = _job_context.set({**_job_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _job_context.reset(token)
+
+
+class JobContextFilter(logging.Filter):
+    """
+    Attach job context to log records as record.context.
+
+    Attributes:
+        fields (dict): Static per-job fields (job id, observable, ...)
+    """
+
+    def __init__(self, fields: Dict[str, Any] = None):
+        """
+        Initialize the filter.
+
+        Args:
+            fields (dict): Static per-job fields
+        """
+        super(JobContextFilter, self).__init__()
+        self.fields = fields or {}
+
+    def filter(self, record):
+        """Add context to the record; never drops it."""
+        record.context = {**self.fields, **_job_context.get()}
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Rate limit repeated log messages.
+
+    Records are grouped by logger, level and message template. At most
+    `rate` records per group are passed every `per` seconds; the number of
+    suppressed records is reported on the next record that gets through.
+    ERROR and CRITICAL records are never suppressed.
+
+    Attributes:
+        rate (int): Records allowed per group and window
+        per (float): Window length in seconds
+    """
+
+    MAX_GROUPS = 1024
+
+    def __init__(self, rate: int = 10, per: float = 60.0):
+        """
+        Initialize the filter.
+
+        Args:
+            rate (int): Records allowed per group and window (default: 10)
+            per (float): Window length in seconds (default: 60)
+        """
+        super(RateLimitFilter, self).__init__()
+        self.rate = rate
+        self.per = per
+        self._groups = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        """Return False if the record exceeds its group's rate."""
+        if record.levelno >= logging.ERROR:
+            return True
+
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+
+        with self._lock:
+            group = self._groups.get(key)
+            if group is None or now - group[0] >= self.per:
+                if group is None and len(self._groups) >= self.MAX_GROUPS:
+                    self._groups.clear()
+                suppressed = group[2] if group else 0
+                self._groups[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+
+            if group[1] < self.rate:
+                group[1] += 1
+                return True
+
+            group[2] += 1
+            return False
+
+
+class JSONFormatter(logging.Formatter):
+    """Format log records as single-line JSON objects."""
+
+    def format(self, record):
+        """Render the record as JSON."""
+        payload = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        payload.update(getattr(record, 'context', {}))
+        if getattr(record, 'suppressed', 0):
+            payload['suppressed'] = record.suppressed
+        if record.exc_info:
+            payload['exception'] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that defers formatting and never blocks on a full queue."""
+
+    def __init__(self, log_queue):
+        super(_NonBlockingQueueHandler, self).__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # The listener runs in-process, so the record does not need to be
+        # pickled; leave formatting to the writer thread.
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _FlushingQueueListener(QueueListener):
+    """QueueListener whose stop marker waits for room in a full queue."""
+
+    def enqueue_sentinel(self):
+        # The stock listener uses put_nowait(), which raises queue.Full on a
+        # bounded queue that is full; the writer thread is still draining it,
+        # so a blocking put always gets through.
+        self.queue.put(self._sentinel)
+
+
+class LogPipeline:
+    """
+    Non-blocking logging pipeline attached to the root logger.
+
+    Log calls only apply filters and enqueue the record; a background
+    thread formats records and writes them to the stream.
+
+    Attributes:
+        level (int): Root log level
+        handler (QueueHandler): Handler installed on the root logger
+        listener (QueueListener): Background writer
+    """
+
+    def __init__(self, level: int = logging.INFO, fmt: str = 'json', context: Dict[str, Any] = None,
+                 rate_limit: int = 10, rate_period: float = 60.0, stream=None, queue_size: int = 10000):
+        """
+        Initialize the pipeline.
+
+        Args:
+            level (int): Root log level (default: INFO)
+            fmt (str): 'json' for structured records, 'text' for plain lines (default: 'json')
+            context (dict): Static per-job fields attached to every record
+            rate_limit (int): Repeated records allowed per window, 0 disables (default: 10)
+            rate_period (float): Rate limit window in seconds (default: 60)
+            stream: Output stream (default: sys.stderr)
+            queue_size (int): Maximum queued records before dropping (default: 10000)
+        """
+        self.level = level
+        self.stream = stream or sys.stderr
+
+        stream_handler = logging.StreamHandler(self.stream)
+        if fmt == 'json':
+            stream_handler.setFormatter(JSONFormatter())
+        else:
+            stream_handler.setFormatter(
+                logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            )
+
+        self.handler = _NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+        self.handler.addFilter(JobContextFilter(context))
+        if rate_limit:
+            self.handler.addFilter(RateLimitFilter(rate=rate_limit, per=rate_period))
+
+        self.listener = _FlushingQueueListener(self.handler.queue, stream_handler)
+        self._running = False
+
+    def start(self):
+        """Install the handler on the root logger and start the writer thread."""
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            if isinstance(existing, _NonBlockingQueueHandler):
+                root.removeHandler(existing)
+        root.addHandler(self.handler)
+        root.setLevel(self.level)
+
+        self.listener.start()
+        self._running = True
+
+    def flush(self):
+        """Write out all queued records, then keep the pipeline running."""
+        if not self._running:
+            return
+        self.listener.stop()
+        self._report_dropped()
+        self.stream.flush()
+        self.listener.start()
+
+    def stop(self):
+        """Write out all queued records and stop the writer thread."""
+        if not self._running:
+            return
+        self._running = False
+        self.listener.stop()
+        self._report_dropped()
+        self.stream.flush()
+        logging.getLogger().removeHandler(self.handler)
+
+    def _report_dropped(self):
+        """Note records dropped because the queue was full."""
+        if self.handler.dropped:
+            self.stream.write(f'logging: dropped {self.handler.dropped} records (queue full)\n')
+            self.handler.dropped = 0
+
+
+class JobLoggingMixin:
+    """
+    Logging pipeline lifecycle for Cortex workers.
+
+    Mixed into BaseAnalyzer and BaseResponder ahead of the cortexutils class:
+    setup_logging() installs a LogPipeline tagged with get_log_context(),
+    and error() / report() flush queued records before the job ends.
+    """
+
+    # Directory name the Cortex process runner gives each job
+    JOB_DIRECTORY_PATTERN = re.compile(r'^cortex-job-(?P<job_id>.+)-\d+$')
+
+    def setup_logging(self):
+        """
+        Configure non-blocking structured logging for the job.
+
+        Records are queued and written to stderr by a background thread.
+        Behaviour is controlled by optional configuration parameters:
+        log_level (default: INFO), log_format ('json' or 'text', default: json)
+        and log_rate_limit (repeats of one message per minute, 0 disables,
+        default: 10).
+        """
+        level = logging.getLevelName(str(self.get_param('config.log_level', 'INFO')).upper())
+        if not isinstance(level, int):
+            level = logging.INFO
+
+        self._log_pipeline = LogPipeline(
+            level=level,
+            fmt=self.get_param('config.log_format', 'json'),
+            context=self.get_log_context(),
+            rate_limit=self.get_param('config.log_rate_limit', 10)
+        )
+        self._log_pipeline.start()
+        atexit.register(self._log_pipeline.stop)
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def get_log_context(self):
+        """
+        Return per-job fields attached to every log record.
+
+        Override (and extend the result of super()) to add worker-specific
+        fields.
+
+        Returns:
+            dict: Context fields
+        """
+        context = {
+            'service': self.service_name,
+            'data_type': self.data_type
+        }
+        job_id = self.get_job_id()
+        if job_id:
+            context['job_id'] = job_id
+        return context
+
+    def get_job_id(self):
+        """
+        Return the Cortex job id, if it can be determined.
+
+        Taken from the CORTEX_JOB_ID environment variable, or from the job
+        directory when it is named cortex-job-<id>-<n> as the Cortex process
+        runner does. Docker jobs always run in /job, which carries no id.
+
+        Returns:
+            str: Job id, or None
+        """
+        job_id = self.get_env('CORTEX_JOB_ID')
+        if job_id:
+            return job_id
+        if self.job_directory:
+            match = self.JOB_DIRECTORY_PATTERN.match(os.path.basename(os.path.normpath(self.job_directory)))
+            if match:
+                return match.group('job_id')
+        return None
+
+    def flush_logging(self):
+        """Write out all queued log records."""
+        pipeline = getattr(self, '_log_pipeline', None)
+        if pipeline is not None:
+            pipeline.flush()
+
+    def error(self, message, ensure_ascii=False):
+        """
+        Flush queued log records, then report the error and exit.
+
+        Args:
+            message (str): Error message
+            ensure_ascii (bool): Force ascii output (default: False)
+        """
+        self.flush_logging()
+        super(JobLoggingMixin, self).error(message, ensure_ascii)
+
+    def report(self, output, ensure_ascii=False):
+        """
+        Report results, then flush queued log records.
+
+        Args:
+            output (dict): Results to report
+            ensure_ascii (bool): Force ascii output (default: False)
+        """
+        try:
+            super(JobLoggingMixin, self).report(output, ensure_ascii)
+        finally:
+            self.flush_logging()
@@ -0,0 +1,295 @@
+"""
+On-demand profiling for individual analyzer and responder jobs.
+
+This module provides JobProfiler, which records any combination of:
+- cpu: cProfile statistics (binary .prof plus a text report)
+- memory: tracemalloc top allocations and peak traced memory
+- rss: peak resident set size of the process
+
+JobProfilingMixin wires a JobProfiler into the BaseAnalyzer and
+BaseResponder job lifecycle.
+
+Profiling is opt-in: cProfile and tracemalloc are only imported and started
+once a profile is requested, so jobs that do not ask for one pay nothing.
+"""
+
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import List, Set
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+class JobProfiler:
+    """
+    Profile a single job and write the results to files.
+
+    Attributes:
+        modes (set): Enabled modes ('cpu', 'memory', 'rss')
+        output_dir (str): Directory the profile files are written to
+        top (int): Number of entries in the text reports
+    """
+
+    MODES = ('cpu', 'memory', 'rss')
+
+    def __init__(self, modes: Set[str], output_dir: str, top: int = 25):
+        """
+        Initialize the profiler.
+
+        Args:
+            modes (set): Modes to enable, see parse_modes()
+            output_dir (str): Directory for profile files
+            top (int): Number of entries in the text reports (default: 25)
+        """
+        self.modes = modes
+        self.output_dir = output_dir
+        self.top = top
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._cpu_profile = None
+        self._started_at = None
+
+    @classmethod
+    def parse_modes(cls, value) -> Set[str]:
+        """
+        Parse a profile setting into a set of modes.
+
+        Accepts True / 'true' / '1' / 'all' for every mode, or a comma
+        separated list such as 'cpu,rss'. Unknown names are ignored.
+
+        Args:
+            value: Config parameter or environment variable value
+
+        Returns:
+            set: Enabled modes (empty if profiling is off)
+        """
+        if value is True:
+            return set(cls.MODES)
+        if not value or value is False:
+            return set()
+
+        names = {name.strip().lower() for name in str(value).split(',') if name.strip()}
+        if names & {'1', 'true', 'yes', 'all'}:
+            return set(cls.MODES)
+        return names & set(cls.MODES)
+
+    def start(self) -> None:
+        """Start collecting the enabled profiles."""
+        self._started_at = time.perf_counter()
+
+        if 'memory' in self.modes:
+            import tracemalloc
+            tracemalloc.start(25)
+
+        if 'cpu' in self.modes:
+            import cProfile
+            self._cpu_profile = cProfile.Profile()
+            self._cpu_profile.enable()
+
+    def stop(self) -> List[str]:
+        """
+        Stop profiling and write the results.
+
+        Returns:
+            list: Paths of the files written
+        """
+        if self._started_at is None:
+            return []
+
+        if self._cpu_profile is not None:
+            self._cpu_profile.disable()
+
+        wall_time = time.perf_counter() - self._started_at
+        self._started_at = None
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        files = []
+        summary = {'modes': sorted(self.modes), 'wall_time_seconds': round(wall_time, 6)}
+
+        if self._cpu_profile is not None:
+            files.extend(self._write_cpu_profile())
+            self._cpu_profile = None
+
+        if 'memory' in self.modes:
+            path, peak = self._write_memory_profile()
+            files.append(path)
+            summary['tracemalloc_peak_bytes'] = peak
+
+        if 'rss' in self.modes:
+            summary['peak_rss_bytes'] = self._peak_rss()
+
+        summary_path = os.path.join(self.output_dir, 'profile-summary.json')
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        files.append(summary_path)
+
+        self.logger.info('Wrote job profile to %s', self.output_dir)
+        return files
+
+    def _write_cpu_profile(self) -> List[str]:
+        """Dump cProfile stats as .prof and as a cumulative-time text report."""
+        import pstats
+
+        prof_path = os.path.join(self.output_dir, 'profile-cpu.prof')
+        self._cpu_profile.dump_stats(prof_path)
+
+        text_path = os.path.join(self.output_dir, 'profile-cpu.txt')
+        with open(text_path, 'w', encoding='utf-8') as f:
+            stats = pstats.Stats(self._cpu_profile, stream=f)
+            stats.sort_stats('cumulative').print_stats(self.top)
+
+        return [prof_path, text_path]
+
+    def _write_memory_profile(self):
+        """Write the top tracemalloc allocations and return (path, peak bytes)."""
+        import tracemalloc
+
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        path = os.path.join(self.output_dir, 'profile-memory.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f'Peak traced memory: {peak} bytes\n')
+            f.write(f'Top {self.top} allocations by line:\n')
+            for stat in snapshot.statistics('lineno')[:self.top]:
+                f.write(f'{stat}\n')
+
+        return path, peak
+
+    @staticmethod
+    def _peak_rss():
+        """Return peak RSS of this process in bytes, or None if unavailable."""
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class JobProfilingMixin:
+    """
+    Opt-in profiling lifecycle for Cortex workers.
+
+    Mixed into BaseAnalyzer and BaseResponder ahead of the logging mixin:
+    setup_profiling() starts a JobProfiler when one is requested, and
+    error() / report() write the profile before the job ends (and before
+    queued log records are flushed).
+
+    Attributes:
+        profile_artifacts (list): File artifacts for the written profile,
+                                  read by BaseAnalyzer.artifacts()
+        supports_profile_artifacts (bool): Whether the worker can attach
+                                           the profile to its report
+    """
+
+    OUTPUTS = ('files', 'artifacts', 'both')
+
+    supports_profile_artifacts = False
+    profile_artifacts = ()
+
+    def setup_profiling(self):
+        """
+        Start opt-in profiling for this job.
+
+        Enabled by the profile configuration parameter or the CORTEX_PROFILE
+        environment variable: 'all', or a comma separated list of 'cpu',
+        'memory' and 'rss'.
+
+        Results are written once to the job output directory.
+        profile_output (or CORTEX_PROFILE_OUTPUT) set to 'artifacts' or
+        'both' also references those files as artifacts of the report;
+        the default 'files' does not.
+        """
+        self._profiler = None
+        self.profile_artifacts = []
+
+        modes = JobProfiler.parse_modes(self.get_param('config.profile') or self.get_env('CORTEX_PROFILE'))
+        if not modes:
+            return
+
+        self._profile_output = str(
+            self.get_param('config.profile_output') or self.get_env('CORTEX_PROFILE_OUTPUT', 'files')
+        ).lower()
+        if self._profile_output not in self.OUTPUTS:
+            self.logger.warning('Unknown profile_output %r, writing files', self._profile_output)
+            self._profile_output = 'files'
+
+        if self.job_directory:
+            output_dir = os.path.join(self.job_directory, 'output')
+        else:
+            # Input came from stdin, so there is no output directory; the
+            # files are kept here and the location is logged
+            output_dir = tempfile.mkdtemp(prefix='cortex-profile-')
+
+        self._profiler = JobProfiler(modes, output_dir)
+        self._profiler.start()
+
+    def finish_profiling(self):
+        """
+        Stop profiling, write the results and collect profile_artifacts.
+
+        The files already sit in the job output directory, so artifacts
+        reference them by name instead of copying them.
+        """
+        profiler = getattr(self, '_profiler', None)
+        if profiler is None:
+            return
+        self._profiler = None
+
+        try:
+            files = profiler.stop()
+        except Exception as e:
+            self.logger.warning('Failed to write job profile: %s', e)
+            files = []
+
+        if not files:
+            return
+
+        if self._profile_output == 'files':
+            if not self.job_directory:
+                self.logger.info('Profile written to %s', profiler.output_dir)
+        elif not self.supports_profile_artifacts:
+            self.logger.warning('%s cannot attach artifacts; profile written to %s',
+                                self.__class__.__name__, profiler.output_dir)
+        elif not self.job_directory:
+            self.logger.warning('No job directory to attach artifacts to; profile written to %s',
+                                profiler.output_dir)
+        else:
+            self.profile_artifacts = [
+                {
+                    'dataType': 'file',
+                    'file': os.path.basename(path),
+                    'filename': os.path.basename(path),
+                    'message': 'Job profile'
+                }
+                for path in files
+            ]
+
+    def error(self, message, ensure_ascii=False):
+        """
+        Write any job profile, then report the error and exit.
+
+        Args:
+            message (str): Error message
+            ensure_ascii (bool): Force ascii output (default: False)
+        """
+        self.finish_profiling()
+        super(JobProfilingMixin, self).error(message, ensure_ascii)
+
+    def report(self, output, ensure_ascii=False):
+        """
+        Write any job profile, then report results.
+
+        Args:
+            output (dict): Results to report
+            ensure_ascii (bool): Force ascii output (default: False)
+        """
+        self.finish_profiling()
+        super(JobProfilingMixin, self).report(output, ensure_ascii)
@@ -0,0 +1,188 @@
+#!/bin/bash
+# Common - HTTPCache Test
+# Checks APIClient/HTTPCache caching behaviour against a local HTTP server:
+# freshness, 304 revalidation, no-store, copy isolation, LRU eviction, disk tier, Vary and
+# credential separation.
+
+# Colors for output
+RED='\033[0;31m'
+GREEN='\033[0;32m'
+BLUE='\033[0;34m'
+NC='\033[0m' # No Color
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+
+echo -e "${BLUE}=========================================${NC}"
+echo -e "${BLUE}Common - HTTPCache Test${NC}"
+echo -e "${BLUE}=========================================${NC}"
+echo ""
+
+python3 - "$SCRIPT_DIR/../.." << 'EOF'
+import json
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, sys.argv[1])
+from common.utils import APIClient, HTTPCache
+
+requests_seen = []
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Endpoints named after the caching behaviour they exercise."""
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, headers, payload=None):
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        requests_seen.append((path, dict(self.headers)))
+
+        if path == '/fresh':
+            return self._send(200, {'Cache-Control': 'max-age=60'}, {'path': path})
+        if path == '/etag':
+            if self.headers.get('If-None-Match') == '"v1"':
+                return self._send(304, {'ETag': '"v1"'})
+            return self._send(200, {'ETag': '"v1"', 'Cache-Control': 'no-cache'}, {'path': path})
+        if path == '/etag-max-age':
+            # The 304 carries only the validator, not the freshness headers
+            if self.headers.get('If-None-Match') == '"v2"':
+                return self._send(304, {'ETag': '"v2"'})
+            return self._send(200, {'ETag': '"v2"', 'Cache-Control': 'max-age=1'}, {'path': path})
+        if path == '/last-modified':
+            if self.headers.get('If-Modified-Since') == 'Wed, 29 Oct 2025 00:00:00 GMT':
+                return self._send(304, {})
+            return self._send(200, {'Last-Modified': 'Wed, 29 Oct 2025 00:00:00 GMT'}, {'path': path})
+        if path == '/no-store':
+            return self._send(200, {'Cache-Control': 'no-store, max-age=60'}, {'path': path})
+        if path == '/vary':
+            return self._send(200, {'Cache-Control': 'max-age=60', 'Vary': 'Accept-Language'},
+                              {'lang': self.headers.get('Accept-Language')})
+        if path == '/whoami':
+            return self._send(200, {'Cache-Control': 'max-age=60'},
+                              {'auth': self.headers.get('Authorization')})
+        if path.startswith('/item/'):
+            return self._send(200, {'Cache-Control': 'max-age=60'}, {'path': path, 'pad': 'x' * 100})
+        self._send(404, {}, {'error': 'not found'})
+
+
+server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+base_url = f'http://127.0.0.1:{server.server_port}'
+
+
+def count(path):
+    return sum(1 for seen_path, _ in requests_seen if seen_path == path)
+
+
+def last_headers(path):
+    return [headers for seen_path, headers in requests_seen if seen_path == path][-1]
+
+
+failed = 0
+
+
+def check(name, actual, expected):
+    global failed
+    if actual == expected:
+        print(f'  ✅ {name}: {actual}')
+    else:
+        print(f'  ❌ {name}: expected {expected}, got {actual}')
+        failed += 1
+
+
+client = APIClient(base_url=base_url, cache=HTTPCache())
+
+# Fresh entries are served without a request
+client.get('/fresh')
+check('max-age: second GET served from cache', (client.get('/fresh'), count('/fresh')), ({'path': '/fresh'}, 1))
+
+# Stale entries are revalidated; a 304 returns the cached value
+client.get('/etag')
+value = client.get('/etag')
+check('ETag: revalidated with If-None-Match', last_headers('/etag').get('If-None-Match'), '"v1"')
+check('ETag: 304 returns cached value', (value, count('/etag')), ({'path': '/etag'}, 2))
+
+client.get('/last-modified')
+value = client.get('/last-modified')
+check('Last-Modified: revalidated with If-Modified-Since',
+      last_headers('/last-modified').get('If-Modified-Since'), 'Wed, 29 Oct 2025 00:00:00 GMT')
+check('Last-Modified: 304 returns cached value', value, {'path': '/last-modified'})
+
+# A 304 without Cache-Control keeps the stored max-age
+client.get('/etag-max-age')
+time.sleep(1.1)
+client.get('/etag-max-age')
+client.get('/etag-max-age')
+client.get('/etag-max-age')
+check('304 without Cache-Control: stored max-age kept', count('/etag-max-age'), 2)
+
+# Every hit returns a copy; changing it does not change the cache
+client.get('/fresh')['path'] = 'changed'
+client.get('/etag')['path'] = 'changed'
+check('Copies: cache hit unaffected by caller changes', client.get('/fresh'), {'path': '/fresh'})
+check('Copies: 304 unaffected by caller changes', client.get('/etag'), {'path': '/etag'})
+
+# no-store responses are never cached
+client.get('/no-store')
+client.get('/no-store')
+check('no-store: every GET reaches the server', count('/no-store'), 2)
+
+# Vary: a different Accept-Language is a miss
+client.get('/vary', headers={'Accept-Language': 'en'})
+client.get('/vary', headers={'Accept-Language': 'en'})
+value = client.get('/vary', headers={'Accept-Language': 'fr'})
+check('Vary: matching header served from cache, other header fetched', (value, count('/vary')), ({'lang': 'fr'}, 2))
+
+# Credentials: a response for one Authorization is not served to another
+alice = client.get('/whoami', headers={'Authorization': 'Bearer alice'})
+bob = client.get('/whoami', headers={'Authorization': 'Bearer bob'})
+client.get('/whoami', headers={'Authorization': 'Bearer alice'})
+check('Credentials: separate entries per Authorization',
+      (alice['auth'], bob['auth'], count('/whoami')), ('Bearer alice', 'Bearer bob', 2))
+
+# LRU eviction by entry count
+lru = APIClient(base_url=base_url, cache=HTTPCache(max_entries=2))
+for name in ('a', 'b', 'a', 'c'):
+    lru.get(f'/item/{name}')
+lru.get('/item/a')
+lru.get('/item/b')
+check('LRU entries: least recently used entry evicted',
+      (count('/item/a'), count('/item/b'), len(lru.cache._entries)), (1, 2, 2))
+
+# LRU eviction by bytes (each body is ~130 bytes)
+sized = APIClient(base_url=base_url, cache=HTTPCache(max_bytes=300))
+for name in ('x', 'y', 'z'):
+    sized.get(f'/item/{name}')
+check('LRU bytes: total kept under max_bytes', (len(sized.cache._entries), sized.cache._size <= 300), (2, True))
+
+# Disk tier: a new process-level cache reloads entries from cache_dir
+cache_dir = tempfile.mkdtemp()
+APIClient(base_url=base_url, cache=HTTPCache(cache_dir=cache_dir)).get('/item/disk')
+reloaded = APIClient(base_url=base_url, cache=HTTPCache(cache_dir=cache_dir)).get('/item/disk')
+check('Disk tier: entry reloaded without a request', (reloaded['path'], count('/item/disk')), ('/item/disk', 1))
+
+server.shutdown()
+sys.exit(1 if failed else 0)
+EOF
+RESULT=$?
+echo ""
+
+if [ $RESULT -eq 0 ]; then
+    echo -e "${GREEN}SUCCESS! HTTPCache is working correctly.${NC}"
+else
+    echo -e "${RED}❌ HTTPCache test failed${NC}"
+fi
+exit $RESULT
@@ -0,0 +1,193 @@
+#!/bin/bash
+# Common - Logging Pipeline Test
+# Checks the non-blocking logging pipeline: JSON records, per-job context,
+# rate limiting, and that error() / report() flush queued records, even
+# when the queue is full.
+
+# Colors for output
+RED='\033[0;31m'
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+BLUE='\033[0;34m'
+NC='\033[0m' # No Color
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+WORK_DIR=$(mktemp -d)
+trap 'rm -rf "$WORK_DIR"' EXIT
+
+echo -e "${BLUE}=========================================${NC}"
+echo -e "${BLUE}Common - Logging Pipeline Test${NC}"
+echo -e "${BLUE}=========================================${NC}"
+echo ""
+
+# Minimal analyzer used for the job runs below
+cat > "$WORK_DIR/worker.py" << 'WORKER'
+import sys
+import time
+
+sys.path.insert(0, sys.argv.pop(2))
+from common.base_analyzer import BaseAnalyzer
+from common.logging_utils import LogPipeline
+
+
+class SlowStream:
+    """stderr that writes slowly, so the log queue fills up."""
+
+    def write(self, text):
+        time.sleep(0.001)
+        sys.stderr.write(text)
+
+    def flush(self):
+        sys.stderr.flush()
+
+
+class LoggingAnalyzer(BaseAnalyzer):
+
+    def setup_logging(self):
+        super(LoggingAnalyzer, self).setup_logging()
+        if self.get_param('config.mode') == 'full_queue':
+            self._log_pipeline.stop()
+            self._log_pipeline = LogPipeline(context=self.get_log_context(), rate_limit=0,
+                                             stream=SlowStream(), queue_size=5)
+            self._log_pipeline.start()
+
+    def run(self):
+        mode = self.get_param('config.mode')
+        if mode == 'full_queue':
+            for number in range(200):
+                self.logger.info('record %d', number)
+        else:
+            self.logger.info('running %s', mode)
+        if mode == 'error':
+            self.error('boom')
+        self.report({'success': True})
+
+
+LoggingAnalyzer().run()
+WORKER
+
+# Run the analyzer in a job directory; prints the job directory
+run_job() {
+    local mode=$1 job_dir=$2
+    mkdir -p "$job_dir/input"
+    cat > "$job_dir/input/input.json" << EOF
+{"data": "user@example.com", "dataType": "mail", "tlp": 2, "pap": 2,
+ "config": {"service": "LoggingTest", "mode": "$mode"}}
+EOF
+    python3 "$WORK_DIR/worker.py" "$job_dir" "$SCRIPT_DIR/../.." 2> "$job_dir/stderr.log"
+    echo $? > "$job_dir/exit_code"
+}
+
+echo -e "${YELLOW}[STEP 1]${NC} Running jobs (report, error, full queue, job ids)..."
+run_job report "$WORK_DIR/job"
+run_job error "$WORK_DIR/error/job"
+run_job full_queue "$WORK_DIR/full/job"
+run_job report "$WORK_DIR/cortex-job-AVxD93kq-4231"
+CORTEX_JOB_ID=env-job-id run_job report "$WORK_DIR/env/job"
+echo ""
+
+echo -e "${YELLOW}[STEP 2]${NC} Checking results..."
+python3 - "$WORK_DIR" "$SCRIPT_DIR/../.." << 'EOF'
+import io
+import json
+import logging
+import os
+import sys
+import time
+
+work_dir = sys.argv[1]
+sys.path.insert(0, sys.argv[2])
+from common.logging_utils import LogPipeline, log_context
+
+failed = 0
+
+
+def check(name, actual, expected):
+    global failed
+    if actual == expected:
+        print(f'  ✅ {name}: {actual}')
+    else:
+        print(f'  ❌ {name}: expected {expected}, got {actual}')
+        failed += 1
+
+
+def job(name):
+    job_dir = os.path.join(work_dir, name)
+    output = json.load(open(os.path.join(job_dir, 'output', 'output.json')))
+    exit_code = int(open(os.path.join(job_dir, 'exit_code')).read())
+    records = []
+    for line in open(os.path.join(job_dir, 'stderr.log')):
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            pass
+    return exit_code, output, records
+
+
+# JSON records and per-job context, flushed by report()
+exit_code, output, records = job('job')
+running = [record for record in records if record.get('message') == 'running report']
+check('report: job succeeded', (exit_code, output.get('success')), (0, True))
+check('report: queued record flushed as JSON', len(running), 1)
+check('report: record carries job context',
+      {key: running[0].get(key) for key in ('level', 'service', 'data_type', 'observable')} if running else None,
+      {'level': 'INFO', 'service': 'LoggingTest', 'data_type': 'mail', 'observable': 'user@example.com'})
+
+# Docker jobs run in /job: no job_id rather than a constant one
+check('job_id: omitted for a job directory named "job"', 'job_id' in running[0] if running else None, False)
+
+_, _, records = job('cortex-job-AVxD93kq-4231')
+check('job_id: taken from a Cortex process job directory', {r.get('job_id') for r in records}, {'AVxD93kq'})
+
+_, _, records = job('env/job')
+check('job_id: taken from CORTEX_JOB_ID', {r.get('job_id') for r in records}, {'env-job-id'})
+
+# error() flushes queued records before exiting
+exit_code, output, records = job('error/job')
+check('error: job failed with its message', (exit_code, output.get('success'), output.get('errorMessage')),
+      (1, False, 'boom'))
+check('error: queued record flushed', [r['message'] for r in records if r.get('message') == 'running error'],
+      ['running error'])
+
+# A full queue at report() time must not turn a successful job into an error
+exit_code, output, records = job('full/job')
+written = [r for r in records if r.get('message', '').startswith('record ')]
+dropped = [line for line in open(os.path.join(work_dir, 'full/job/stderr.log')) if line.startswith('logging: dropped')]
+check('full queue: report() output kept', (exit_code, output.get('success')), (0, True))
+check('full queue: every record written or counted as dropped',
+      len(written) + sum(int(line.split()[2]) for line in dropped), 200)
+
+# log_context adds fields for a block only
+stream = io.StringIO()
+pipeline = LogPipeline(context={'service': 'Inline'}, stream=stream, rate_limit=2, rate_period=0.5)
+pipeline.start()
+logger = logging.getLogger('inline')
+with log_context(mailbox='a@example.com'):
+    logger.info('inside')
+logger.info('outside')
+
+# Rate limiting: repeats beyond the limit are suppressed and counted
+for _ in range(5):
+    logger.warning('repeated %s', 'warning')
+time.sleep(0.6)
+logger.warning('repeated %s', 'warning')
+pipeline.stop()
+records = [json.loads(line) for line in stream.getvalue().splitlines()]
+check('log_context: field added inside the block',
+      [(r['message'], r.get('mailbox')) for r in records if r['logger'] == 'inline' and r['level'] == 'INFO'],
+      [('inside', 'a@example.com'), ('outside', None)])
+repeated = [r for r in records if r['message'] == 'repeated warning']
+check('rate limit: records within the window', len(repeated), 3)
+check('rate limit: suppressed count reported on the next record', repeated[-1].get('suppressed'), 3)
+
+sys.exit(1 if failed else 0)
+EOF
+RESULT=$?
+echo ""
+
+if [ $RESULT -eq 0 ]; then
+    echo -e "${GREEN}SUCCESS! Logging pipeline is working correctly.${NC}"
+else
+    echo -e "${RED}❌ Logging pipeline test failed${NC}"
+fi
+exit $RESULT
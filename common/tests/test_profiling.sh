@@ -0,0 +1,122 @@
+#!/bin/bash
+# Common - Job Profiling Test
+# Runs a minimal analyzer with profile=all and checks the profile files in
+# the job output directory and the file artifacts in output.json, for
+# profile_output=both and the default (files), and that nothing is written
+# when profiling is off.
+
+# Colors for output
+RED='\033[0;31m'
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+BLUE='\033[0;34m'
+NC='\033[0m' # No Color
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+WORK_DIR=$(mktemp -d)
+trap 'rm -rf "$WORK_DIR"' EXIT
+
+echo -e "${BLUE}=========================================${NC}"
+echo -e "${BLUE}Common - Job Profiling Test${NC}"
+echo -e "${BLUE}=========================================${NC}"
+echo ""
+
+# Minimal analyzer used for the job runs below
+cat > "$WORK_DIR/worker.py" << 'WORKER'
+import sys
+
+sys.path.insert(0, sys.argv.pop(2))
+from common.base_analyzer import BaseAnalyzer
+
+
+class ProfiledAnalyzer(BaseAnalyzer):
+
+    def run(self):
+        squares = [number * number for number in range(100000)]
+        self.report({'success': True, 'total': sum(squares)})
+
+
+ProfiledAnalyzer().run()
+WORKER
+
+# Run the analyzer in a job directory with the given extra config
+run_job() {
+    local job_dir=$1 config=$2
+    mkdir -p "$job_dir/input"
+    cat > "$job_dir/input/input.json" << EOF
+{"data": "user@example.com", "dataType": "mail", "tlp": 2, "pap": 2,
+ "config": {"service": "ProfilingTest"$config}}
+EOF
+    python3 "$WORK_DIR/worker.py" "$job_dir" "$SCRIPT_DIR/../.." 2> "$job_dir/stderr.log"
+    echo $? > "$job_dir/exit_code"
+}
+
+echo -e "${YELLOW}[STEP 1]${NC} Running jobs (profile_output=both, default, profiling off)..."
+run_job "$WORK_DIR/both" ', "profile": "all", "profile_output": "both"'
+run_job "$WORK_DIR/files" ', "profile": "all"'
+run_job "$WORK_DIR/off" ''
+echo ""
+
+echo -e "${YELLOW}[STEP 2]${NC} Checking results..."
+python3 - "$WORK_DIR" << 'EOF'
+import json
+import os
+import sys
+
+work_dir = sys.argv[1]
+profile_files = ['profile-cpu.prof', 'profile-cpu.txt', 'profile-memory.txt', 'profile-summary.json']
+
+failed = 0
+
+
+def check(name, actual, expected):
+    global failed
+    if actual == expected:
+        print(f'  ✅ {name}: {actual}')
+    else:
+        print(f'  ❌ {name}: expected {expected}, got {actual}')
+        failed += 1
+
+
+def job(name):
+    output_dir = os.path.join(work_dir, name, 'output')
+    output = json.load(open(os.path.join(output_dir, 'output.json')))
+    exit_code = int(open(os.path.join(work_dir, name, 'exit_code')).read())
+    files = sorted(f for f in os.listdir(output_dir) if f != 'output.json')
+    file_artifacts = sorted(a.get('file') for a in output.get('artifacts', []) if a.get('dataType') == 'file')
+    return exit_code, output, files, file_artifacts
+
+
+# profile_output=both: files written once and referenced as artifacts
+exit_code, output, files, file_artifacts = job('both')
+check('both: job succeeded', (exit_code, output.get('success')), (0, True))
+check('both: profile files in output/', files, profile_files)
+check('both: file artifacts in output.json', file_artifacts, profile_files)
+check('both: artifacts named after their file',
+      all(a['filename'] == a['file'] for a in output['artifacts'] if a.get('dataType') == 'file'), True)
+summary = json.load(open(os.path.join(work_dir, 'both', 'output', 'profile-summary.json')))
+check('both: summary lists the modes', sorted(summary.get('modes', [])), ['cpu', 'memory', 'rss'])
+
+# Default output: files only
+exit_code, output, files, file_artifacts = job('files')
+check('default: job succeeded', (exit_code, output.get('success')), (0, True))
+check('default: profile files in output/', files, profile_files)
+check('default: no file artifacts', file_artifacts, [])
+
+# Profiling off: nothing written
+exit_code, output, files, file_artifacts = job('off')
+check('off: job succeeded', (exit_code, output.get('success')), (0, True))
+check('off: no profile files', files, [])
+check('off: no file artifacts', file_artifacts, [])
+
+sys.exit(1 if failed else 0)
+EOF
+RESULT=$?
+echo ""
+
+if [ $RESULT -eq 0 ]; then
+    echo -e "${GREEN}SUCCESS! Job profiling is working correctly.${NC}"
+else
+    echo -e "${RED}❌ Job profiling test failed${NC}"
+fi
+exit $RESULT
@@ -2,6 +2,7 @@
 Utility classes and functions for Cortex analyzers and responders.
 
 This module provides reusable components:
+- HTTPCache: Conditional HTTP response cache (memory with optional disk tier)
 - APIClient: HTTP client for REST API calls
 - DataValidator: Input data validation utilities
 """
@@ -9,25 +10,399 @@ This module provides reusable components:
 import requests
 import json
 import re
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
 from typing import Dict, Any, Optional, List
 import logging
 
 
+class HTTPCache:
+    """
+    Conditional cache for GET responses.
+
+    Honors Cache-Control (no-store, no-cache, max-age), Expires, ETag and
+    Last-Modified. Fresh entries are served without a request; stale entries
+    with validators are revalidated with If-None-Match / If-Modified-Since so
+    that a 304 costs one round trip and no body transfer.
+
+    Entries live in an in-memory LRU bounded by entry count and bytes. When
+    cache_dir is set, entries are also written to disk and reloaded on a
+    memory miss, so reference data survives across analyzer processes.
+
+    Entries are keyed by URL, query parameters and a digest of any
+    credential headers (Authorization, cookies, API keys/tokens), so a
+    response fetched with one set of credentials is never served to a
+    request sent with another, including across processes sharing cache_dir.
+
+    Only the raw body is kept; every hit decodes it again, so callers get
+    their own copy they are free to modify, and max_bytes bounds the memory
+    the entries hold.
+
+    Attributes:
+        max_entries (int): Maximum number of in-memory entries
+        max_bytes (int): Maximum total body size held in memory
+        cache_dir (str): Directory for the disk tier (None disables it)
+        max_disk_bytes (int): Maximum total size of the disk tier
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 16 * 1024 * 1024,
+                 cache_dir: str = None, max_disk_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Maximum number of in-memory entries (default: 256)
+            max_bytes (int): Maximum in-memory body bytes (default: 16 MiB)
+            cache_dir (str): Directory for the optional disk tier (default: None)
+            max_disk_bytes (int): Maximum disk tier size in bytes (default: 64 MiB)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    # Header names (or name fragments) that carry credentials
+    CREDENTIAL_HEADERS = ('authorization', 'proxy-authorization', 'cookie')
+    CREDENTIAL_FRAGMENTS = ('key', 'token', 'secret', 'auth')
+
+    @classmethod
+    def make_key(cls, url: str, params: Dict[str, Any] = None, headers: Dict[str, str] = None) -> str:
+        """
+        Build a cache key from URL, query parameters and credential headers.
+
+        Credential header values are hashed, so the key (which is also
+        stored in the disk tier) never contains the secrets themselves.
+
+        Args:
+            url (str): Full request URL
+            params (dict): Query parameters
+            headers (dict): Headers the request will be sent with
+
+        Returns:
+            str: Cache key
+        """
+        key = url
+        if params:
+            items = sorted((str(k), str(v)) for k, v in params.items())
+            key += '?' + json.dumps(items, separators=(',', ':'))
+
+        credentials = sorted(
+            (name.lower(), str(value)) for name, value in (headers or {}).items()
+            if name.lower() in cls.CREDENTIAL_HEADERS
+            or any(fragment in name.lower() for fragment in cls.CREDENTIAL_FRAGMENTS)
+        )
+        if credentials:
+            digest = hashlib.sha256(json.dumps(credentials).encode('utf-8')).hexdigest()
+            key += '#cred=' + digest
+        return key
+
+    def lookup(self, key: str, request_headers: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """
+        Return the cache entry for a key if it matches the request.
+
+        Args:
+            key (str): Cache key from make_key()
+            request_headers (dict): Headers the request will be sent with
+
+        Returns:
+            dict: Cache entry, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is None and self.cache_dir:
+            entry = self._load_from_disk(key)
+            if entry is not None:
+                self._insert(key, entry)
+
+        if entry is None or not self._vary_matches(entry, request_headers):
+            return None
+        return entry
+
+    @staticmethod
+    def is_fresh(entry: Dict[str, Any]) -> bool:
+        """
+        Check whether an entry can be served without revalidation.
+
+        Args:
+            entry (dict): Cache entry
+
+        Returns:
+            bool: True if the entry is still fresh
+        """
+        return entry['expires_at'] is not None and time.time() < entry['expires_at']
+
+    @staticmethod
+    def conditional_headers(entry: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Build revalidation headers for a stale entry.
+
+        Args:
+            entry (dict): Cache entry
+
+        Returns:
+            dict: If-None-Match / If-Modified-Since headers (may be empty)
+        """
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    @staticmethod
+    def value(entry: Dict[str, Any]) -> Any:
+        """
+        Decode a cache entry's body.
+
+        Args:
+            entry (dict): Cache entry
+
+        Returns:
+            Decoded JSON body (a new object on every call)
+        """
+        return json.loads(entry['body'])
+
+    def store(self, key: str, response: requests.Response, request_headers: Dict[str, str]) -> None:
+        """
+        Store a 200 response if its headers allow caching.
+
+        Args:
+            key (str): Cache key from make_key()
+            response (requests.Response): Response to cache
+            request_headers (dict): Headers the request was sent with
+        """
+        directives = self._parse_cache_control(response.headers.get('Cache-Control', ''))
+        vary = response.headers.get('Vary', '')
+        if 'no-store' in directives or vary.strip() == '*':
+            return
+
+        entry = {
+            'body': response.content,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            # Kept so a 304 that omits them does not reset the freshness lifetime
+            'cache_control': response.headers.get('Cache-Control', ''),
+            'expires': response.headers.get('Expires'),
+            'expires_at': self._expires_at(response.headers, directives),
+            'vary': {
+                name.strip().lower(): self._header_value(request_headers, name.strip())
+                for name in vary.split(',') if name.strip()
+            }
+        }
+
+        # Nothing to serve fresh and nothing to revalidate with
+        if entry['expires_at'] is None and not (entry['etag'] or entry['last_modified']):
+            return
+
+        self._insert(key, entry)
+        if self.cache_dir:
+            self._save_to_disk(key, entry)
+
+    def refresh(self, key: str, entry: Dict[str, Any], response: requests.Response) -> None:
+        """
+        Update an entry after a 304 Not Modified response.
+
+        Freshness headers the 304 repeats replace the stored ones; the rest
+        are kept (RFC 9111, section 4.3.4), and the lifetime restarts now.
+
+        Args:
+            key (str): Cache key from make_key()
+            entry (dict): Entry that was revalidated
+            response (requests.Response): The 304 response
+        """
+        entry['cache_control'] = response.headers.get('Cache-Control', entry.get('cache_control', ''))
+        entry['expires'] = response.headers.get('Expires', entry.get('expires'))
+        directives = self._parse_cache_control(entry['cache_control'])
+        entry['expires_at'] = self._expires_at({'Expires': entry['expires']}, directives)
+        entry['etag'] = response.headers.get('ETag', entry['etag'])
+        entry['last_modified'] = response.headers.get('Last-Modified', entry['last_modified'])
+        if self.cache_dir:
+            self._save_to_disk(key, entry)
+
+    def clear(self) -> None:
+        """Remove all in-memory entries (the disk tier is left untouched)."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _insert(self, key: str, entry: Dict[str, Any]) -> None:
+        """Insert an entry into the memory tier and evict LRU entries over budget."""
+        size = len(entry['body'])
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old['body'])
+            self._entries[key] = entry
+            self._size += size
+
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted['body'])
+
+    def _disk_path(self, key: str) -> str:
+        """Return the disk tier file path for a key."""
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f'{digest}.json')
+
+    def _save_to_disk(self, key: str, entry: Dict[str, Any]) -> None:
+        """Persist an entry to the disk tier, then trim the tier to its budget."""
+        record = {
+            'key': key,
+            'body': entry['body'].decode('utf-8', errors='replace'),
+            'etag': entry['etag'],
+            'last_modified': entry['last_modified'],
+            'cache_control': entry['cache_control'],
+            'expires': entry['expires'],
+            'expires_at': entry['expires_at'],
+            'vary': entry['vary']
+        }
+        path = self._disk_path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(record, f)
+            os.replace(tmp_path, path)
+            self._trim_disk()
+        except OSError as e:
+            self.logger.warning('Failed to write cache entry to disk: %s', e)
+
+    def _load_from_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        """Load an entry from the disk tier, or return None."""
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning('Discarding unreadable cache entry %s: %s', path, e)
+            return None
+
+        if record.get('key') != key:
+            return None
+
+        return {
+            'body': record['body'].encode('utf-8'),
+            'etag': record.get('etag'),
+            'last_modified': record.get('last_modified'),
+            'cache_control': record.get('cache_control', ''),
+            'expires': record.get('expires'),
+            'expires_at': record.get('expires_at'),
+            'vary': record.get('vary', {})
+        }
+
+    def _trim_disk(self) -> None:
+        """Delete the oldest disk entries until the tier fits max_disk_bytes."""
+        files = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        files.sort()
+        while total > self.max_disk_bytes and files:
+            _, size, path = files.pop(0)
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def _vary_matches(self, entry: Dict[str, Any], request_headers: Dict[str, str]) -> bool:
+        """Check that request headers listed in Vary match the cached ones."""
+        return all(
+            self._header_value(request_headers, name) == value
+            for name, value in entry['vary'].items()
+        )
+
+    @staticmethod
+    def _header_value(headers: Dict[str, str], name: str) -> Optional[str]:
+        """Case-insensitive header lookup."""
+        name = name.lower()
+        for k, v in (headers or {}).items():
+            if k.lower() == name:
+                return v
+        return None
+
+    @staticmethod
+    def _parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+        """Parse a Cache-Control header into a directive dict."""
+        directives = {}
+        for part in value.split(','):
+            part = part.strip()
+            if not part:
+                continue
+            name, _, arg = part.partition('=')
+            directives[name.strip().lower()] = arg.strip().strip('"') or None
+        return directives
+
+    @staticmethod
+    def _expires_at(headers, directives: Dict[str, Optional[str]]) -> Optional[float]:
+        """Compute the absolute expiry time, or None if the entry must be revalidated."""
+        if 'no-cache' in directives:
+            return None
+
+        max_age = directives.get('max-age')
+        if max_age is not None:
+            try:
+                return time.time() + max(int(max_age), 0)
+            except ValueError:
+                return None
+
+        expires = headers.get('Expires')
+        if expires:
+            try:
+                return parsedate_to_datetime(expires).timestamp()
+            except (TypeError, ValueError):
+                return None
+
+        return None
+
+
 class APIClient:
     """
     HTTP client for making REST API calls.
 
     This class provides a standardized interface for making API requests
     with proper error handling, timeout management, and response parsing.
+    Connections are pooled in a requests.Session, so reuse one client for
+    repeated calls to the same hosts.
 
     Attributes:
         base_url (str): Base URL for API endpoints
         timeout (int): Request timeout in seconds
         verify_ssl (bool): Whether to verify SSL certificates
         headers (dict): Default HTTP headers
+        cache (HTTPCache): Optional conditional cache for GET responses
+        session (requests.Session): Pooled HTTP session
     """
 
-    def __init__(self, base_url: str = None, timeout: int = 30, verify_ssl: bool = True, headers: Dict[str, str] = None):
+    def __init__(self, base_url: str = None, timeout: int = 30, verify_ssl: bool = True, headers: Dict[str, str] = None,
+                 cache: HTTPCache = None, pool_size: int = 10):
         """
         Initialize API client.
 
@@ -36,6 +411,8 @@ class APIClient:
             timeout (int): Request timeout in seconds (default: 30)
             verify_ssl (bool): Whether to verify SSL certificates (default: True)
             headers (dict): Default HTTP headers
+            cache (HTTPCache): Optional conditional cache for GET responses (default: None)
+            pool_size (int): Pooled connections kept per host (default: 10)
         """
         self.base_url = base_url
         self.timeout = timeout
@@ -44,12 +421,21 @@ class APIClient:
             'Content-Type': 'application/json',
             'Accept': 'application/json'
         }
+        self.cache = cache
+
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         self.logger = logging.getLogger(self.__class__.__name__)
 
     def get(self, endpoint: str, params: Dict[str, Any] = None, headers: Dict[str, str] = None) -> Dict[str, Any]:
         """
         Make a GET request.
 
+        When a cache is configured, fresh responses are served locally and
+        stale ones are revalidated with a conditional request.
+
         Args:
             endpoint (str): API endpoint (will be appended to base_url if set)
             params (dict): Query parameters
@@ -64,34 +450,58 @@ class APIClient:
         url = self._build_url(endpoint)
         request_headers = self._merge_headers(headers)
 
-        self.logger.info(f'GET request to: {url}')
+        entry = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(url, params, request_headers)
+            entry = self.cache.lookup(cache_key, request_headers)
+            if entry is not None:
+                if self.cache.is_fresh(entry):
+                    self.logger.debug('GET cache hit: %s', url)
+                    return self.cache.value(entry)
+                request_headers.update(self.cache.conditional_headers(entry))
+
+        self.logger.info('GET request to: %s', url)
 
         try:
-            response = requests.get(
+            response = self.session.get(
                 url,
                 params=params,
                 headers=request_headers,
                 timeout=self.timeout,
                 verify=self.verify_ssl
             )
+
+            if entry is not None and response.status_code == 304:
+                self.logger.debug('GET revalidated (304): %s', url)
+                self.cache.refresh(cache_key, entry, response)
+                return self.cache.value(entry)
+
             response.raise_for_status()
-            return response.json()
+            result = response.json()
+
+            if self.cache is not None and response.status_code == 200:
+                self.cache.store(cache_key, response, request_headers)
+
+            return result
 
         except requests.exceptions.Timeout:
-            self.logger.error(f'Request timeout: {url}')
+            self.logger.error('Request timeout: %s', url)
             raise
         except requests.exceptions.RequestException as e:
-            self.logger.error(f'Request failed: {str(e)}')
+            self.logger.error('Request failed: %s', e)
             raise
 
-    def post(self, endpoint: str, data: Dict[str, Any] = None, headers: Dict[str, str] = None) -> Dict[str, Any]:
+    def post(self, endpoint: str, data: Dict[str, Any] = None, headers: Dict[str, str] = None,
+             form: Dict[str, str] = None) -> Dict[str, Any]:
         """
         Make a POST request.
 
         Args:
             endpoint (str): API endpoint (will be appended to base_url if set)
-            data (dict): Request body data
+            data (dict): Request body data, sent as JSON
             headers (dict): Additional headers (merged with default headers)
+            form (dict): Request body sent form-encoded instead of JSON
+                         (e.g. OAuth token requests)
 
         Returns:
             dict: JSON response
@@ -102,12 +512,16 @@ class APIClient:
         url = self._build_url(endpoint)
         request_headers = self._merge_headers(headers)
 
-        self.logger.info(f'POST request to: {url}')
+        if form is not None:
+            request_headers['Content-Type'] = 'application/x-www-form-urlencoded'
+
+        self.logger.info('POST request to: %s', url)
 
         try:
-            response = requests.post(
+            response = self.session.post(
                 url,
-                json=data,
+                json=data if form is None else None,
+                data=form,
                 headers=request_headers,
                 timeout=self.timeout,
                 verify=self.verify_ssl
@@ -116,10 +530,10 @@ class APIClient:
             return response.json()
 
         except requests.exceptions.Timeout:
-            self.logger.error(f'Request timeout: {url}')
+            self.logger.error('Request timeout: %s', url)
             raise
         except requests.exceptions.RequestException as e:
-            self.logger.error(f'Request failed: {str(e)}')
+            self.logger.error('Request failed: %s', e)
             raise
 
     def _build_url(self, endpoint: str) -> str: